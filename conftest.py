@@ -0,0 +1,88 @@
+"""
+Shared pytest fixtures for the MCWB tests
+"""
+
+import pytest
+from unittest.mock import Mock
+from weather_bot import WeatherBot, _geocode
+
+
+class FakeSerial:
+    """Open serial port stand-in that records each write() payload in order"""
+
+    is_open = True
+    in_waiting = 0
+
+    def __init__(self):
+        self.writes = []
+        self.write = self.writes.append
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeResponse:
+    """requests.Response stand-in whose json() returns a fixed payload"""
+
+    __slots__ = ("_payload",)
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def open_meteo_get(geo_json, wx_json):
+    """Build an HTTP GET stand-in that answers by Open-Meteo endpoint rather than call order"""
+    responses = {
+        "geocoding-api.open-meteo.com": FakeResponse(geo_json),
+        "/v1/forecast": FakeResponse(wx_json),
+    }
+
+    def fake_get(url, *args, **kwargs):
+        for endpoint, resp in responses.items():
+            if endpoint in url:
+                return resp
+        raise AssertionError(f"unexpected URL {url}")
+
+    return fake_get
+
+
+@pytest.fixture(autouse=True)
+def _clear_geocode_cache():
+    """Start every test with an empty geocoding cache so lookups hit the test's mocks"""
+    _geocode.cache_clear()
+
+
+@pytest.fixture(scope="module")
+def wx_bot():
+    """WeatherBot shared by every test in a module; not connected to a radio"""
+    return WeatherBot(debug=False)
+
+
+@pytest.fixture
+def bot_serial(wx_bot):
+    """Fresh FakeSerial attached to wx_bot, recording the frames the bot sends"""
+    wx_bot._ser = FakeSerial()
+    yield wx_bot._ser
+    wx_bot._ser = None
+
+
+@pytest.fixture
+def open_meteo(monkeypatch):
+    """
+    Serve canned payloads from weather_bot._SESSION.get
+
+    Call the fixture with (geo_json, wx_json); it returns the patched Mock.
+    """
+    def serve(geo_json, wx_json):
+        get = Mock(side_effect=open_meteo_get(geo_json, wx_json))
+        monkeypatch.setattr("weather_bot._SESSION.get", get)
+        return get
+
+    return serve
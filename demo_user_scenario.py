@@ -32,7 +32,7 @@ def simulate_user_scenario():
     print("-" * 70)
     print()
     
-    with patch('weather_bot.requests.get') as mock_get:
+    with patch('weather_bot._SESSION.get') as mock_get:
         # Mock successful API responses
         geocoding_response = MagicMock()
         geocoding_response.json.return_value = {
@@ -4,10 +4,16 @@ MeshCore - Core library for mesh radio network communication
 This module provides the core functionality for communicating via MeshCore mesh radio network.
 """
 
+import collections
 import json
 import time
+import asyncio
+import select
+import struct
+import sys
 import threading
 import html
+import re
 from typing import Dict, Any, Optional, Callable
 from datetime import datetime
 
@@ -29,6 +35,26 @@ _RESP_NO_MORE_MSGS = 10     # Response: message queue is empty
 _RESP_CONTACT_MSG_V3 = 16   # V3 variant of contact message (includes SNR)
 _RESP_CHANNEL_MSG_V3 = 17   # V3 variant of channel message (includes SNR)
 _MAX_FRAME_SIZE = 300       # Maximum valid frame payload size in bytes
+_MAX_LINE_SIZE = 64 * 1024  # Longest partial text line buffered while waiting for its newline
+# CMD_SEND_CHANNEL_TXT_MSG frame header, packed in one call:
+# frame start(1) + uint16_LE length(2) + code(1) + txt_type(1) + channel_idx(1) + uint32_LE timestamp(4)
+_SEND_CHAN_FRAME_HDR = struct.Struct("<BHBBBI")
+_SEND_CHAN_CMD_LEN = _SEND_CHAN_FRAME_HDR.size - 3  # command bytes preceding the text
+# RESP_CODE_CHANNEL_MSG_RECV_V3 header, unpacked in one call:
+# code(1) + SNR(1) + reserved(2) + channel_idx(1) + path_len(1) + txt_type(1) + uint32_LE timestamp(4)
+_CHAN_MSG_V3_HDR = struct.Struct("<BbHBBBI")
+# Complete CMD_SYNC_NEXT_MESSAGE frame, appended to each sent channel message
+_SYNC_NEXT_MSG_FRAME = bytes([_FRAME_IN, 1, 0, _CMD_SYNC_NEXT_MSG])
+_LINE_PAD_BYTES = bytes(range(0x21)) + b"\x7f"  # ASCII whitespace/control bytes skipped before classifying a text line
+_RX_POLL_INTERVAL = 0.05    # Seconds the listener waits for serial data before re-checking running
+_CLOSE_TIMEOUT = 2.0        # Seconds close() waits for the event loop to flush pending writes
+_SEEN_MAX = 512             # Recently received message keys remembered for duplicate suppression
+_PORT_CACHE_TTL = 5.0       # Seconds a find_serial_ports() enumeration is reused
+# Serial devices used for LoRa modules:
+# - ttyUSB* (FTDI, CP210x, CH340 USB-to-serial adapters)
+# - ttyACM* (Arduino, some ESP32 boards)
+# - ttyAMA* (Raspberry Pi UART)
+_USB_PORT_RE = re.compile(r"tty(?:USB|ACM|AMA)\d+$")
 
 try:
     import serial
@@ -42,19 +68,58 @@ except ImportError:
     class SerialException(Exception):  # type: ignore[no-redef]
         pass
 
+try:
+    import serial_asyncio
+    SERIAL_ASYNCIO_AVAILABLE = True
+except ImportError:
+    SERIAL_ASYNCIO_AVAILABLE = False
+
 
 class MeshCoreMessage:
     """Represents a message in the MeshCore network"""
 
+    # Fixed attribute layout: no per-instance __dict__ for messages created
+    # on every received frame. Messages are immutable once constructed, which
+    # lets to_json() serialize once and reuse the result (e.g. on resends).
+    __slots__ = ("sender", "content", "message_type", "timestamp",
+                 "channel", "channel_idx", "_json")
+
     def __init__(self, sender: str, content: str, message_type: str = "text",
                  timestamp: Optional[float] = None, channel: Optional[str] = None,
                  channel_idx: Optional[int] = None):
-        self.sender = sender
-        self.content = content
-        self.message_type = message_type
-        self.timestamp = timestamp or time.time()
-        self.channel = channel
-        self.channel_idx = channel_idx  # Raw channel index from LoRa (0-7)
+        init = object.__setattr__
+        init(self, "sender", sender)
+        init(self, "content", content)
+        init(self, "message_type", message_type)
+        init(self, "timestamp", timestamp or time.time())
+        init(self, "channel", channel)
+        init(self, "channel_idx", channel_idx)  # Raw channel index from LoRa (0-7)
+        init(self, "_json", None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"MeshCoreMessage is immutable: cannot set '{name}'")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"MeshCoreMessage is immutable: cannot delete '{name}'")
+
+    def __reduce__(self):
+        # Rebuild through __init__ so copy, deepcopy and pickle never assign
+        # slots through the raising __setattr__
+        return (type(self), (self.sender, self.content, self.message_type,
+                             self.timestamp, self.channel, self.channel_idx))
+
+    def replace(self, **changes) -> 'MeshCoreMessage':
+        """Return a copy of this message with the given fields changed"""
+        fields = {
+            "sender": self.sender,
+            "content": self.content,
+            "message_type": self.message_type,
+            "timestamp": self.timestamp,
+            "channel": self.channel,
+            "channel_idx": self.channel_idx,
+        }
+        fields.update(changes)
+        return MeshCoreMessage(**fields)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary"""
@@ -71,18 +136,25 @@ class MeshCoreMessage:
         return data
 
     def to_json(self) -> str:
-        """Convert message to JSON string"""
-        return json.dumps(self.to_dict())
+        """Convert message to JSON string (serialized once, then cached)"""
+        if self._json is None:
+            object.__setattr__(self, "_json", json.dumps(self.to_dict()))
+        return self._json
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MeshCoreMessage':
         """Create message from dictionary"""
+        channel = data.get("channel")
+        if isinstance(channel, str):
+            # Intern wire-supplied channel names so comparisons against the
+            # (interned) channel filter are identity checks
+            channel = sys.intern(channel)
         return cls(
             sender=data.get("sender", "unknown"),
             content=data.get("content", ""),
             message_type=data.get("type", "text"),
             timestamp=data.get("timestamp"),
-            channel=data.get("channel"),
+            channel=channel,
             channel_idx=data.get("channel_idx")
         )
 
@@ -93,6 +165,107 @@ class MeshCoreMessage:
         return cls.from_dict(data)
 
 
+class _MeshCoreSerialProtocol(asyncio.Protocol):
+    """asyncio protocol feeding received serial data into a MeshCore node"""
+
+    def __init__(self, mesh: 'MeshCore'):
+        self.mesh = mesh
+        self._buffer = bytearray()
+
+    def data_received(self, data: bytes):
+        self._buffer.extend(data)
+        self.mesh._feed_rx_buffer(self._buffer)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if exc is not None:
+            self.mesh.log(f"LoRa serial read error: {exc}")
+
+
+def _find_frame_start(buf: bytearray, end: int) -> int:
+    """
+    Return the index of the first complete, plausible binary frame header in
+    buf[1:end], or -1 if there is none.
+
+    Printable text never holds a header: a byte after '>' of 0x20 or more
+    makes the length far larger than _MAX_FRAME_SIZE.
+    """
+    pos = buf.find(b">", 1, end)
+    while pos >= 0 and pos + 3 <= len(buf):
+        length = int.from_bytes(buf[pos + 1:pos + 3], "little")
+        if 0 < length <= _MAX_FRAME_SIZE:
+            return pos
+        pos = buf.find(b">", pos + 1, end)
+    return -1
+
+
+class _AsyncSerialWriter:
+    """
+    Expose an asyncio serial transport through the write/close subset of serial.Serial
+
+    Writes are queued rather than sent inline; a background task drains the
+    queue and joins every frame queued since it last ran into one transport
+    write, so a burst of replies goes out as a single batch.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+        self._outq: 'asyncio.Queue[bytes]' = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._sender_task = self._loop.create_task(self._drain())
+        self._closed = False
+
+    async def _drain(self):
+        while True:
+            batch = [await self._outq.get()]
+            while not self._outq.empty():
+                batch.append(self._outq.get_nowait())
+            self._transport.write(b"".join(batch))
+
+    @property
+    def is_open(self) -> bool:
+        return not self._transport.is_closing()
+
+    def write(self, data: bytes):
+        if threading.get_ident() == self._loop_thread:
+            self._outq.put_nowait(data)
+        else:
+            # Other threads must wake the loop, or the frame waits for its
+            # next unrelated event
+            self._loop.call_soon_threadsafe(self._outq.put_nowait, data)
+
+    def close(self):
+        # Writes from other threads are callbacks queued on the loop; closing
+        # through the same queue runs after them, so none is lost
+        if not self._loop.is_running():
+            self._close_now()
+        elif threading.get_ident() == self._loop_thread:
+            self._loop.call_soon(self._close_now)
+        else:
+            closed = threading.Event()
+
+            def close_on_loop():
+                self._close_now()
+                closed.set()
+
+            self._loop.call_soon_threadsafe(close_on_loop)
+            if not closed.wait(timeout=_CLOSE_TIMEOUT):
+                self._close_now()  # the loop stopped before it got there
+
+    def _close_now(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._sender_task.cancel()
+        # Flush frames the sender task had not picked up yet
+        pending = []
+        while not self._outq.empty():
+            pending.append(self._outq.get_nowait())
+        if pending:
+            self._transport.write(b"".join(pending))
+        self._transport.close()
+
+
 # Standard serial baud rates accepted for preflight validation
 VALID_BAUD_RATES = {110, 300, 600, 1200, 2400, 4800, 9600, 14400, 19200,
                     38400, 57600, 115200, 128000, 256000}
@@ -132,15 +305,74 @@ def normalize_channel_name(channel: Optional[str], warn: bool = True) -> Optiona
     return channel
 
 
-def find_serial_ports(debug: bool = False) -> list:
+def _lora_unescape(line: str) -> str:
+    """
+    Decode the HTML entities seen on LoRa links (&amp;, &lt;, &gt;).
+
+    Copies the text between entities in one pass. Any other '&' sequence
+    (named, numeric or legacy entities) hands the whole line to html.unescape,
+    so the result is always identical to html.unescape(line).
+    """
+    parts = []
+    pos = 0
+    amp = line.find("&")
+    while amp != -1:
+        if line.startswith("&amp;", amp):
+            char, end = "&", amp + 5
+        elif line.startswith("&lt;", amp):
+            char, end = "<", amp + 4
+        elif line.startswith("&gt;", amp):
+            char, end = ">", amp + 4
+        else:
+            return html.unescape(line)
+        parts.append(line[pos:amp])
+        parts.append(char)
+        pos = end
+        amp = line.find("&", pos)
+    parts.append(line[pos:])
+    return "".join(parts)
+
+
+def _accept_any_channel(message: MeshCoreMessage) -> bool:
+    """Channel filter predicate used while no filter is set"""
+    return True
+
+
+def _channel_filter_predicate(channels: Optional[list]) -> Callable[[MeshCoreMessage], bool]:
+    """
+    Build the receive_message accept predicate for a channel filter.
+
+    Only messages that carry an explicit channel name are filtered.
+    Binary-protocol frames only carry a numeric channel_idx; the bot's
+    internal name→idx mapping is independent of the physical radio's
+    channel-slot assignment, so idx-based filtering is unreliable and
+    would silently drop messages from any channel whose physical slot
+    doesn't happen to match the bot-internal index (e.g. #weather).
+    For those messages (channel is None) we accept unconditionally and
+    rely on the radio hardware to enforce channel membership.
+    """
+    if not channels:
+        return _accept_any_channel
+    names = frozenset(channels)
+    return lambda message: message.channel is None or message.channel in names
+
+
+# Last successful port enumeration: {"at": monotonic time, "ports": tuple}
+_port_cache: Dict[str, Any] = {}
+
+
+def find_serial_ports(debug: bool = False, refresh: bool = False) -> list:
     """
     Find available USB serial ports for LoRa modules.
     
     Returns a list of available serial port device paths, prioritizing
-    common LoRa/FTDI USB-to-serial adapters.
+    common LoRa/FTDI USB-to-serial adapters. Enumerating ports can be slow
+    (notably on Windows), so a successful result is reused for
+    _PORT_CACHE_TTL seconds unless refresh is set.
     
     Args:
         debug: Enable debug output
+        refresh: Enumerate the ports even if a cached result is still fresh
         
     Returns:
         List of available serial port paths (e.g., ['/dev/ttyUSB0', '/dev/ttyACM0'])
@@ -150,17 +382,19 @@ def find_serial_ports(debug: bool = False) -> list:
             print("pyserial is not installed. Cannot detect serial ports.")
         return []
     
+    now = time.monotonic()
+    if not refresh and _port_cache and now - _port_cache["at"] < _PORT_CACHE_TTL:
+        if debug:
+            print("Using cached serial port list")
+        return list(_port_cache["ports"])
+    
     try:
-        ports = list_ports.comports()
+        is_lora_port = _USB_PORT_RE.search
         available = []
         
-        for port in ports:
-            # Common USB serial devices used for LoRa modules:
-            # - ttyUSB* (FTDI, CP210x, CH340 USB-to-serial adapters)
-            # - ttyACM* (Arduino, some ESP32 boards)
-            # - ttyAMA* (Raspberry Pi UART)
+        for port in list_ports.comports():
             device = port.device
-            if any(pattern in device for pattern in ['ttyUSB', 'ttyACM', 'ttyAMA']):
+            if is_lora_port(device):
                 available.append(device)
                 if debug:
                     desc = port.description or "Unknown"
@@ -168,6 +402,8 @@ def find_serial_ports(debug: bool = False) -> list:
         
         # Sort to provide consistent ordering (ttyUSB0 before ttyUSB1, etc.)
         available.sort()
+        _port_cache["at"] = now
+        _port_cache["ports"] = tuple(available)
         return available
     
     except Exception as e:
@@ -176,11 +412,13 @@ def find_serial_ports(debug: bool = False) -> list:
         return []
 
 
+
 class MeshCore:
     """Main MeshCore communication handler"""
 
     def __init__(self, node_id: str, debug: bool = False,
-                 serial_port: Optional[str] = None, baud_rate: int = 9600):
+                 serial_port: Optional[str] = None, baud_rate: int = 9600,
+                 suppress_duplicates: bool = False):
         """
         Initialize MeshCore
 
@@ -190,12 +428,19 @@ class MeshCore:
             serial_port: Serial port for LoRa module (e.g., /dev/ttyUSB0). When None,
                          the node operates in simulation mode (no actual radio transmission).
             baud_rate: Baud rate for LoRa serial connection (default: 9600)
+            suppress_duplicates: Drop messages identical to one of the last
+                         _SEEN_MAX received (same sender, content, channel_idx
+                         and timestamp, the sender's for binary frames),
+                         e.g. mesh re-deliveries
         """
         self.node_id = node_id
         self.debug = debug
         self.message_handlers = {}
         self.running = False
         self.channel_filter = None  # None means listen to all channels
+        self._filter_accept = _accept_any_channel  # receive-side filter, rebound by set_channel_filter
+        # Recent message keys, oldest first (None when duplicates are not suppressed)
+        self._seen = collections.OrderedDict() if suppress_duplicates else None
 
         # Channel name to channel_idx mapping for LoRa transmission
         # Allows different named channels to use different channel indices
@@ -208,6 +453,24 @@ class MeshCore:
         self.baud_rate = baud_rate
         self._serial = None
         self._listener_thread = None
+        # Serialises writes from the listener thread and send_message() callers
+        self._write_lock = threading.Lock()
+
+        # Frame code -> handler dispatch table for received binary frames.
+        # Each handler takes the full frame payload (code byte included).
+        self._rx_handlers = {
+            0x00: self._handle_nop,
+            _CMD_APP_START: self._handle_app_start_ack,
+            _CMD_GET_DEVICE_TIME: self._handle_get_device_time,
+            _PUSH_SEND_CONFIRMED: self._handle_send_confirmed,
+            _PUSH_MSG_WAITING: self._handle_push_waiting,
+            _PUSH_CHAN_MSG: self._handle_push_channel_msg,
+            _RESP_CHANNEL_MSG: self._handle_channel_msg,
+            _RESP_CHANNEL_MSG_V3: self._handle_channel_msg_v3,
+            _RESP_CONTACT_MSG: self._handle_contact_msg,
+            _RESP_CONTACT_MSG_V3: self._handle_contact_msg_v3,
+            _RESP_NO_MORE_MSGS: self._handle_no_more_msgs,
+        }
 
     def log(self, message: str):
         """Log debug messages"""
@@ -240,11 +503,12 @@ class MeshCore:
         if channels is None:
             self.channel_filter = None
         elif isinstance(channels, str):
-            self.channel_filter = [channels]
+            self.channel_filter = [sys.intern(channels)]
         elif isinstance(channels, list):
-            self.channel_filter = channels if channels else None
+            self.channel_filter = [sys.intern(ch) for ch in channels] if channels else None
         else:
             raise TypeError(f"channels must be str, list, or None, not {type(channels).__name__}")
+        self._filter_accept = _channel_filter_predicate(self.channel_filter)
         
         # Pre-populate channel mappings for broadcast channels
         if self.channel_filter:
@@ -356,13 +620,17 @@ class MeshCore:
                 actual_channel_idx = self._get_channel_idx(channel)
             
             try:
-                ts_bytes = int(time.time()).to_bytes(4, "little")
-                cmd_data = bytes([_CMD_SEND_CHAN_MSG, 0, actual_channel_idx]) + ts_bytes + content.encode("utf-8")
-                frame = bytes([_FRAME_IN]) + len(cmd_data).to_bytes(2, "little") + cmd_data
-                self._serial.write(frame)
+                text = content.encode("utf-8")
+                frame = _SEND_CHAN_FRAME_HDR.pack(
+                    _FRAME_IN, _SEND_CHAN_CMD_LEN + len(text),
+                    _CMD_SEND_CHAN_MSG, 0, actual_channel_idx, int(time.time()),
+                ) + text
+                # Follow the message with a sync so the companion radio can process
+                # and respond; both frames go out in a single write
+                with self._write_lock:
+                    self._serial.write(frame + _SYNC_NEXT_MSG_FRAME)
                 self.log(f"LoRa TX channel msg (idx={actual_channel_idx}): {content}")
-                # After sending, sync to allow the companion radio to process and respond
-                self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+                self.log(f"LoRa CMD: {_SYNC_NEXT_MSG_FRAME[3:].hex()}")
             except SerialException as e:
                 self.log(f"LoRa TX error: {e}")
         else:
@@ -371,39 +639,47 @@ class MeshCore:
 
         return message
 
-    def receive_message(self, message: MeshCoreMessage):
+    def receive_message(self, message: MeshCoreMessage, sent_at: Optional[int] = None):
         """
         Receive and process a message
 
         Args:
             message: MeshCoreMessage object to process
+            sent_at: Sender's timestamp from a binary frame. When given it
+                     replaces message.timestamp (the receive time) in the
+                     duplicate-suppression key, so re-deliveries match
         """
-        channel_info = f" on channel '{message.channel}'" if message.channel else ""
-        if message.channel_idx is not None:
-            channel_info += f" (channel_idx={message.channel_idx})"
-        self.log(f"Received message from {message.sender}{channel_info}: {message.content}")
+        if self.debug:
+            channel_info = f" on channel '{message.channel}'" if message.channel else ""
+            if message.channel_idx is not None:
+                channel_info += f" (channel_idx={message.channel_idx})"
+            self.log(f"Received message from {message.sender}{channel_info}: {message.content}")
+
+        # Mesh flooding can deliver the same message more than once; the
+        # timestamp keeps a user's repeated request from being dropped
+        seen = self._seen
+        if seen is not None:
+            key = (message.sender, message.content, message.channel_idx,
+                   message.timestamp if sent_at is None else sent_at)
+            if key in seen:
+                self.log(f"Ignoring duplicate message from {message.sender}")
+                return
+            seen[key] = None
+            if len(seen) > _SEEN_MAX:
+                seen.popitem(last=False)
 
         # Apply channel filtering if configured
-        if self.channel_filter is not None:
-            # Only filter when the message carries an explicit channel name.
-            # Binary-protocol frames only carry a numeric channel_idx; the bot's
-            # internal name→idx mapping is independent of the physical radio's
-            # channel-slot assignment, so idx-based filtering is unreliable and
-            # would silently drop messages from any channel whose physical slot
-            # doesn't happen to match the bot-internal index (e.g. #weather).
-            # For those messages (message.channel is None) we accept unconditionally
-            # and rely on the radio hardware to enforce channel membership.
-            if message.channel is not None and message.channel not in self.channel_filter:
-                self.log(f"Ignoring message: channel '{message.channel}' "
-                         f"not in filter {self.channel_filter}")
-                return
+        if not self._filter_accept(message):
+            self.log(f"Ignoring message: channel '{message.channel}' "
+                     f"not in filter {self.channel_filter}")
+            return
 
         # Check if we have a handler for this message type
-        if message.message_type in self.message_handlers:
-            handler = self.message_handlers[message.message_type]
-            handler(message)
-        else:
+        handler = self.message_handlers.get(message.message_type)
+        if handler is None:
             self.log(f"No handler for message type: {message.message_type}")
+            return
+        handler(message)
 
     def _connect_serial(self):
         """Open the serial port for the LoRa module"""
@@ -500,106 +776,156 @@ class MeshCore:
         (frames starting with 0x3E '>') and legacy newline-delimited JSON for
         simulation / inter-Python-node communication.
         """
+        # Bytes read from a real serial port that do not yet form a complete
+        # frame or line are kept here until the rest arrives.
+        rx_buffer = bytearray()
         while self.running and self._serial and self._serial.is_open:
             try:
-                # Try to peek at first byte for real serial connections (binary protocol detection)
-                # For mocks/tests, fall back to readline() for compatibility
-                raw = None
-                first_byte = None
-                
                 try:
                     # Check if data is available (real serial only)
-                    if self._serial.in_waiting > 0:
-                        # Read first byte to determine frame type
-                        first_byte = self._serial.read(1)
-                        if not first_byte:
-                            continue
-                        
+                    has_data = self._serial.in_waiting > 0
+                except (TypeError, AttributeError):
+                    # Mock/test object - use readline() directly
+                    has_data = None
+
+                if has_data is not None:
+                    if has_data:
                         # ----------------------------------------------------------------
                         # MeshCore companion radio binary protocol
                         # Frame format (outbound, radio→app):
                         #   0x3E ('>')  - frame start
                         #   uint16 LE   - payload length
                         #   bytes       - payload (first byte = response/push code)
+                        # Everything else is treated as newline-delimited text.
                         # ----------------------------------------------------------------
-                        if first_byte[0] == _FRAME_OUT:
-                            # Read the length header (2 bytes, little-endian)
-                            length_bytes = self._serial.read(2)
-                            if len(length_bytes) < 2:
-                                self.log("Binary frame incomplete: missing length header")
-                                continue
-                            
-                            length = int.from_bytes(length_bytes, "little")
-                            if length == 0 or length > _MAX_FRAME_SIZE:
-                                self.log(f"Binary frame length {length} out of range, skipping")
-                                continue
-                            
-                            # Read the exact payload bytes
-                            payload = self._serial.read(length)
-                            if len(payload) < length:
-                                self.log(f"Binary frame incomplete: expected {length} bytes, got {len(payload)}")
-                                continue
-                            
-                            # Parse the complete binary frame
-                            self._parse_binary_frame(payload)
-                            continue
-                        
-                        # For non-binary frames, read rest of line
-                        rest_of_line = self._serial.readline()
-                        raw = first_byte + rest_of_line
-                except (TypeError, AttributeError):
-                    # Mock/test object - use readline() directly
-                    pass
-                
-                # Use readline() if we haven't read data yet (mock/test or no data available)
-                if raw is None:
-                    raw = self._serial.readline()
-                    if not raw:
-                        continue
-                    
-                    # Check if this is a binary frame that came via readline() (from tests/mocks)
-                    if raw and len(raw) > 0 and raw[0] == _FRAME_OUT:
-                        if len(raw) < 3:
-                            self.log("Binary frame too short to contain a length header")
-                            continue
-                        length = int.from_bytes(raw[1:3], "little")
-                        if length == 0 or length > _MAX_FRAME_SIZE:
-                            self.log(f"Binary frame length {length} out of range, skipping")
-                            continue
-                        payload = raw[3: 3 + length]
-                        if not payload:
-                            continue
-                        self._parse_binary_frame(payload)
-                        continue
-
-                line = raw.decode("utf-8", errors="ignore").strip()
-                if not line:
+                        rx_buffer.extend(self._serial.read(self._serial.in_waiting))
+                        self._feed_rx_buffer(rx_buffer)
+                    else:
+                        # Idle: wait briefly for the port to become readable rather
+                        # than blocking in readline(), so stop() takes effect quickly.
+                        self._wait_for_rx(_RX_POLL_INTERVAL)
                     continue
-                # Remove embedded control characters (e.g. \r, \x00) that can
-                # corrupt terminal output when raw LoRa radio frames are received.
-                line = "".join(c for c in line if c.isprintable())
-                if not line:
+
+                raw = self._serial.readline()
+                if not raw:
                     continue
-                # Decode HTML entities (e.g. &gt; -> >, &amp; -> &) that may be present
-                # in data from certain LoRa systems or transport layers
-                line = html.unescape(line)
-                # Only attempt JSON parsing for lines that look like JSON objects.
-                # Raw LoRa frames from non-MeshCore devices are silently skipped.
-                # Additional validation: must start with { AND end with }
-                if not (line.startswith("{") and line.endswith("}")):
-                    # Silently skip non-JSON data (binary protocol responses, radio noise, etc.)
+
+                # Check if this is a binary frame that came via readline() (from tests/mocks)
+                if raw[0] == _FRAME_OUT:
+                    if len(raw) < 3:
+                        self.log("Binary frame too short to contain a length header")
+                        continue
+                    length = int.from_bytes(raw[1:3], "little")
+                    if length == 0 or length > _MAX_FRAME_SIZE:
+                        self.log(f"Binary frame length {length} out of range, skipping")
+                        continue
+                    payload = raw[3: 3 + length]
+                    if not payload:
+                        continue
+                    self._parse_binary_frame(payload)
                     continue
-                # Log only after validating it looks like JSON to avoid logging garbled data
-                self.log(f"LoRa RX: {line}")
-                try:
-                    message = MeshCoreMessage.from_json(line)
-                    self.receive_message(message)
-                except (json.JSONDecodeError, KeyError) as e:
-                    self.log(f"Could not parse LoRa message: {e} | raw: {line}")
+
+                self._handle_text_line(raw)
             except SerialException as e:
                 self.log(f"LoRa serial read error: {e}")
                 break
 
+    def _wait_for_rx(self, timeout: float):
+        """
+        Block until the serial port is readable or *timeout* seconds elapse.
+
+        Uses select() on the port's file descriptor where available (POSIX);
+        otherwise (Windows, test doubles) simply sleeps for *timeout*.
+        """
+        try:
+            select.select([self._serial.fileno()], [], [], timeout)
+        except (AttributeError, TypeError, ValueError, OSError):
+            time.sleep(timeout)
+
+    def _handle_text_line(self, raw: bytes):
+        """
+        Process one newline-delimited line of non-binary serial data.
+
+        Lines that look like JSON objects are decoded as MeshCoreMessage and
+        dispatched; radio noise and other non-JSON data is silently dropped.
+        """
+        # Cheap first-byte classification before any decoding: only lines whose
+        # first significant byte is '{' (JSON) or '&' (HTML-encoded JSON) can
+        # become a message. Non-ASCII lead bytes go through the full path since
+        # their printability is only known after decoding.
+        first = raw.lstrip(_LINE_PAD_BYTES)[:1]
+        if not first or (first not in b"{&" and first < b"\x80"):
+            return
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if not line:
+            return
+        # Remove embedded control characters (e.g. \r, \x00) that can
+        # corrupt terminal output when raw LoRa radio frames are received.
+        line = "".join(c for c in line if c.isprintable())
+        if not line:
+            return
+        # Decode HTML entities (e.g. &gt; -> >, &amp; -> &) that may be present
+        # in data from certain LoRa systems or transport layers. Every entity
+        # starts with '&', so plain lines skip the unescape pass entirely.
+        if "&" in line:
+            line = _lora_unescape(line)
+        # Only attempt JSON parsing for lines that look like JSON objects.
+        # Raw LoRa frames from non-MeshCore devices are silently skipped.
+        # Additional validation: must start with { AND end with }
+        if not (line.startswith("{") and line.endswith("}")):
+            # Silently skip non-JSON data (binary protocol responses, radio noise, etc.)
+            return
+        # Log only after validating it looks like JSON to avoid logging garbled data
+        self.log(f"LoRa RX: {line}")
+        try:
+            message = MeshCoreMessage.from_json(line)
+            self.receive_message(message)
+        except (json.JSONDecodeError, KeyError) as e:
+            self.log(f"Could not parse LoRa message: {e} | raw: {line}")
+
+    def _feed_rx_buffer(self, buf: bytearray):
+        """
+        Consume complete frames and lines from an incoming byte accumulator.
+
+        Shared by the threaded and asyncio readers, which both receive
+        arbitrary chunks of serial data. Complete binary frames and newline-terminated lines are removed
+        from *buf* and dispatched; any trailing partial frame is left in place
+        until more data arrives.
+        """
+        while buf:
+            if buf[0] == _FRAME_OUT:
+                if len(buf) < 3:
+                    return
+                length = int.from_bytes(buf[1:3], "little")
+                if length == 0 or length > _MAX_FRAME_SIZE:
+                    self.log(f"Binary frame length {length} out of range, skipping")
+                    del buf[:1]
+                    continue
+                if len(buf) < 3 + length:
+                    return
+                payload = bytes(buf[3:3 + length])
+                del buf[:3 + length]
+                self._parse_binary_frame(payload)
+                continue
+
+            newline = buf.find(b"\n")
+            # A frame header inside the partial line means the line was
+            # noise; resync on it rather than wait for a newline that may
+            # only arrive inside a later frame
+            start = _find_frame_start(buf, newline if newline >= 0 else len(buf))
+            if start > 0:
+                self.log(f"Discarding {start} bytes of noise before binary frame")
+                del buf[:start]
+                continue
+            if newline < 0:
+                if len(buf) > _MAX_LINE_SIZE:
+                    # No terminator in sight - discard accumulated noise
+                    buf.clear()
+                return
+            raw = bytes(buf[:newline + 1])
+            del buf[:newline + 1]
+            self._handle_text_line(raw)
+
     # ------------------------------------------------------------------
     # MeshCore companion radio binary protocol helpers
     # ------------------------------------------------------------------
@@ -613,7 +939,8 @@ class MeshCore:
         if self._serial and self._serial.is_open:
             frame = bytes([_FRAME_IN]) + len(cmd_data).to_bytes(2, "little") + cmd_data
             try:
-                self._serial.write(frame)
+                with self._write_lock:
+                    self._serial.write(frame)
                 self.log(f"LoRa CMD: {cmd_data.hex()}")
             except SerialException as e:
                 self.log(f"LoRa CMD error: {e}")
@@ -627,104 +954,134 @@ class MeshCore:
         that the entire message queue is drained automatically.
         """
         code = payload[0]
+        handler = self._rx_handlers.get(code)
+        if handler is not None:
+            handler(payload)
+        else:
+            self.log(f"MeshCore: unhandled frame code {code:#04x}")
 
-        if code == 0x00:
-            # NOP/keepalive frame from companion radio - ignore silently
-            pass
-
-        elif code == _CMD_APP_START:
-            # CMD_APP_START echo/acknowledgment from companion radio.
-            # The radio may echo this command during session initialization.
-            # No action needed - session is already initialized.
-            self.log("MeshCore: APP_START acknowledged by companion radio")
-
-        elif code == _CMD_GET_DEVICE_TIME:
-            # Companion radio requests current device time.
-            # Respond with RESP_CURR_TIME containing 4-byte UNIX timestamp.
-            self.log("MeshCore: device time requested, responding…")
-            timestamp = int(time.time()).to_bytes(4, "little")
-            response = bytes([_RESP_CURR_TIME]) + timestamp
-            self._send_command(response)
-
-        elif code == _PUSH_SEND_CONFIRMED:
-            # Outgoing message was acknowledged by the mesh network.
-            # Payload: ack_code(4) + round_trip_ms(4). No further action needed.
-            self.log("MeshCore: send confirmed by mesh network")
-
-        elif code == _PUSH_MSG_WAITING:
-            # Companion radio signals that a new message has been received;
-            # request it immediately.
-            self.log("MeshCore: message waiting, fetching…")
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _PUSH_CHAN_MSG:
-            # 0x88 = 0x80 | RESP_CHANNEL_MSG: the companion radio pushes an incoming
-            # channel message directly (without waiting for CMD_SYNC_NEXT_MSG).
-            # Payload layout is identical to RESP_CHANNEL_MSG (0x08):
-            # channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
-            self.log("MeshCore: channel message received (push)")
-            if len(payload) >= 8:
-                channel_idx = payload[1]
-                text = payload[8:].decode("utf-8", "ignore")
-                self.log(f"Binary frame: PUSH_CHAN_MSG on channel_idx {channel_idx}")
-                self._dispatch_channel_message(text, channel_idx)
-            else:
-                self.log(f"Binary frame: PUSH_CHAN_MSG payload too short ({len(payload)} bytes)")
-            # Drain any further queued messages
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _RESP_CHANNEL_MSG:
-            # RESP_CODE_CHANNEL_MSG_RECV:
-            # channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
-            if len(payload) >= 8:
-                channel_idx = payload[1]  # Extract channel_idx from payload
-                text = payload[8:].decode("utf-8", "ignore")
-                self.log(f"Binary frame: CHANNEL_MSG on channel_idx {channel_idx}")
-                self._dispatch_channel_message(text, channel_idx)
-            else:
-                self.log(f"Binary frame: CHANNEL_MSG payload too short ({len(payload)} bytes)")
-            # Fetch the next queued message
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _RESP_CHANNEL_MSG_V3:
-            # RESP_CODE_CHANNEL_MSG_RECV_V3 (includes SNR prefix):
-            # SNR(1) + reserved(2) + channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
-            if len(payload) >= 12:
-                channel_idx = payload[4]  # Extract channel_idx from payload (after SNR + reserved)
-                text = payload[11:].decode("utf-8", "ignore")
-                self.log(f"Binary frame: CHANNEL_MSG_V3 on channel_idx {channel_idx}")
-                self._dispatch_channel_message(text, channel_idx)
-            else:
-                self.log(f"Binary frame: CHANNEL_MSG_V3 payload too short ({len(payload)} bytes)")
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _RESP_CONTACT_MSG:
-            # RESP_CODE_CONTACT_MSG_RECV:
-            # pubkey_prefix(6) + path_len(1) + txt_type(1) + timestamp(4) + text
-            if len(payload) >= 13:
-                sender = payload[1:7].hex()
-                text = payload[13:].decode("utf-8", "ignore")
-                msg = MeshCoreMessage(sender=sender, content=text, message_type="text")
-                self.receive_message(msg)
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _RESP_CONTACT_MSG_V3:
-            # RESP_CODE_CONTACT_MSG_RECV_V3:
-            # SNR(1) + reserved(2) + pubkey_prefix(6) + path_len(1) + txt_type(1) + timestamp(4) + text
-            if len(payload) >= 16:
-                sender = payload[4:10].hex()
-                text = payload[16:].decode("utf-8", "ignore")
-                msg = MeshCoreMessage(sender=sender, content=text, message_type="text")
-                self.receive_message(msg)
-            self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
-
-        elif code == _RESP_NO_MORE_MSGS:
-            self.log("MeshCore: message queue empty")
+    def _handle_nop(self, payload: bytes):
+        """NOP/keepalive frame from companion radio - ignore silently"""
+        pass
+
+    def _handle_app_start_ack(self, payload: bytes):
+        """
+        CMD_APP_START echo/acknowledgment from companion radio.
+
+        The radio may echo this command during session initialization.
+        No action needed - session is already initialized.
+        """
+        self.log("MeshCore: APP_START acknowledged by companion radio")
+
+    def _handle_get_device_time(self, payload: bytes):
+        """
+        Companion radio requests current device time.
+
+        Respond with RESP_CURR_TIME containing 4-byte UNIX timestamp.
+        """
+        self.log("MeshCore: device time requested, responding…")
+        timestamp = int(time.time()).to_bytes(4, "little")
+        response = bytes([_RESP_CURR_TIME]) + timestamp
+        self._send_command(response)
+
+    def _handle_send_confirmed(self, payload: bytes):
+        """
+        Outgoing message was acknowledged by the mesh network.
+
+        Payload: ack_code(4) + round_trip_ms(4). No further action needed.
+        """
+        self.log("MeshCore: send confirmed by mesh network")
+
+    def _handle_push_waiting(self, payload: bytes):
+        """
+        Companion radio signals that a new message has been received;
+        request it immediately.
+        """
+        self.log("MeshCore: message waiting, fetching…")
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+
+    def _handle_push_channel_msg(self, payload: bytes):
+        """
+        0x88 = 0x80 | RESP_CHANNEL_MSG: the companion radio pushes an incoming
+        channel message directly (without waiting for CMD_SYNC_NEXT_MSG).
 
+        Payload layout is identical to RESP_CHANNEL_MSG (0x08):
+        channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
+        """
+        self.log("MeshCore: channel message received (push)")
+        if len(payload) >= 8:
+            channel_idx = payload[1]
+            sent_at = int.from_bytes(payload[4:8], "little")
+            text = payload[8:].decode("utf-8", "ignore")
+            self.log(f"Binary frame: PUSH_CHAN_MSG on channel_idx {channel_idx}")
+            self._dispatch_channel_message(text, channel_idx, sent_at)
         else:
-            self.log(f"MeshCore: unhandled frame code {code:#04x}")
+            self.log(f"Binary frame: PUSH_CHAN_MSG payload too short ({len(payload)} bytes)")
+        # Drain any further queued messages
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
 
-    def _dispatch_channel_message(self, text: str, channel_idx: int = 0):
+    def _handle_channel_msg(self, payload: bytes):
+        """
+        RESP_CODE_CHANNEL_MSG_RECV:
+        channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
+        """
+        if len(payload) >= 8:
+            channel_idx = payload[1]  # Extract channel_idx from payload
+            sent_at = int.from_bytes(payload[4:8], "little")
+            text = payload[8:].decode("utf-8", "ignore")
+            self.log(f"Binary frame: CHANNEL_MSG on channel_idx {channel_idx}")
+            self._dispatch_channel_message(text, channel_idx, sent_at)
+        else:
+            self.log(f"Binary frame: CHANNEL_MSG payload too short ({len(payload)} bytes)")
+        # Fetch the next queued message
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+
+    def _handle_channel_msg_v3(self, payload: bytes):
+        """
+        RESP_CODE_CHANNEL_MSG_RECV_V3 (includes SNR prefix):
+        SNR(1) + reserved(2) + channel_idx(1) + path_len(1) + txt_type(1) + timestamp(4) + text
+        """
+        if len(payload) > _CHAN_MSG_V3_HDR.size:
+            _, _, _, channel_idx, _, _, sent_at = _CHAN_MSG_V3_HDR.unpack_from(payload)
+            text = payload[_CHAN_MSG_V3_HDR.size:].decode("utf-8", "ignore")
+            self.log(f"Binary frame: CHANNEL_MSG_V3 on channel_idx {channel_idx}")
+            self._dispatch_channel_message(text, channel_idx, sent_at)
+        else:
+            self.log(f"Binary frame: CHANNEL_MSG_V3 payload too short ({len(payload)} bytes)")
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+
+    def _handle_contact_msg(self, payload: bytes):
+        """
+        RESP_CODE_CONTACT_MSG_RECV:
+        pubkey_prefix(6) + path_len(1) + txt_type(1) + timestamp(4) + text
+        """
+        if len(payload) >= 13:
+            sender = payload[1:7].hex()
+            sent_at = int.from_bytes(payload[9:13], "little")
+            text = payload[13:].decode("utf-8", "ignore")
+            msg = MeshCoreMessage(sender=sender, content=text, message_type="text")
+            self.receive_message(msg, sent_at)
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+
+    def _handle_contact_msg_v3(self, payload: bytes):
+        """
+        RESP_CODE_CONTACT_MSG_RECV_V3:
+        SNR(1) + reserved(2) + pubkey_prefix(6) + path_len(1) + txt_type(1) + timestamp(4) + text
+        """
+        if len(payload) >= 16:
+            sender = payload[4:10].hex()
+            sent_at = int.from_bytes(payload[12:16], "little")
+            text = payload[16:].decode("utf-8", "ignore")
+            msg = MeshCoreMessage(sender=sender, content=text, message_type="text")
+            self.receive_message(msg, sent_at)
+        self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+
+    def _handle_no_more_msgs(self, payload: bytes):
+        """Message queue is empty"""
+        self.log("MeshCore: message queue empty")
+
+    def _dispatch_channel_message(self, text: str, channel_idx: int = 0,
+                                  sent_at: Optional[int] = None):
         """
         Create and dispatch a MeshCoreMessage from a received channel text.
 
@@ -736,6 +1093,8 @@ class MeshCore:
         Args:
             text: The message text (may include "sender: " prefix)
             channel_idx: The channel index from the LoRa frame (0-7)
+            sent_at: The sender's timestamp from the LoRa frame, used only
+                     to recognise re-deliveries
         """
         colon = text.find(": ")
         if colon > 0:
@@ -753,7 +1112,7 @@ class MeshCore:
         msg = MeshCoreMessage(sender=sender, content=content, message_type="text", 
                             channel=channel_name, channel_idx=channel_idx)
         
-        self.receive_message(msg)
+        self.receive_message(msg, sent_at)
 
     def start(self):
         """Start the MeshCore listener"""
@@ -764,6 +1123,46 @@ class MeshCore:
                 self._start_listener()
         self.log("MeshCore started")
 
+    async def start_async(self):
+        """
+        Start MeshCore on the running asyncio event loop.
+
+        Alternative to start() that reads the serial port through
+        pyserial-asyncio instead of a background listener thread, so sending
+        and receiving share a single event loop. Requires the optional
+        pyserial-asyncio package; stop() works for both modes.
+        """
+        self.running = True
+        if self.serial_port:
+            if not SERIAL_ASYNCIO_AVAILABLE:
+                self.log("pyserial-asyncio is not installed. Install with: pip install pyserial-asyncio")
+            elif self.baud_rate not in VALID_BAUD_RATES:
+                self.log(
+                    f"Invalid baud rate {self.baud_rate}. "
+                    f"Valid rates: {sorted(VALID_BAUD_RATES)}"
+                )
+            else:
+                try:
+                    transport, _ = await serial_asyncio.create_serial_connection(
+                        asyncio.get_running_loop(),
+                        lambda: _MeshCoreSerialProtocol(self),
+                        self.serial_port, baudrate=self.baud_rate,
+                        rtscts=False, dsrdtr=False,
+                    )
+                except SerialException as e:
+                    self.log(f"Failed to open serial port {self.serial_port}: {e}")
+                else:
+                    # Deassert RTS and DTR to prevent unintended resets on ESP32/Arduino
+                    transport.serial.rts = False
+                    transport.serial.dtr = False
+                    self._serial = _AsyncSerialWriter(transport)
+                    self.log(f"LoRa connected on {self.serial_port} at {self.baud_rate} baud (asyncio)")
+                    self._send_command(b"\x01\x03      MCWB")
+                    await asyncio.sleep(0.1)
+                    # Drain any messages queued while we were offline
+                    self._send_command(bytes([_CMD_SYNC_NEXT_MSG]))
+        self.log("MeshCore started")
+
     def stop(self):
         """Stop the MeshCore listener"""
         self.running = False
@@ -8,20 +8,25 @@ import subprocess
 import sys
 import time
 
+try:
+    import pytest  # noqa: F401  (see requirements-dev.txt)
+    PYTEST_AVAILABLE = True
+except ImportError:
+    PYTEST_AVAILABLE = False
+
+try:
+    import xdist  # noqa: F401  (pytest-xdist, optional)
+    XDIST_AVAILABLE = True
+except ImportError:
+    XDIST_AVAILABLE = False
+
 # List of test files to run
 TEST_FILES = [
     'test_usb_port_detection.py',
     'test_lora_serial.py',
     'test_listener_startup.py',
-    'test_weather_bot.py',
     'test_channel_functionality.py',
-    'test_multi_channel.py',
-    'test_multi_channel_reply.py',
     'test_channel_reply_behavior.py',
-    'test_channel_filter_fix.py',
-    'test_no_channel_filtering.py',
-    'test_weather_channel_filtering.py',
-    'test_weather_channel_reply.py',
     'test_html_encoding.py',
     'test_json_parsing_edge_cases.py',
     'test_garbled_data_logging.py',
@@ -31,8 +36,22 @@ TEST_FILES = [
     'test_bot_response.py',
 ]
 
-def run_test(test_file):
-    """Run a single test file and return result"""
+# pytest-based test files, collected together in a single pytest process so
+# Python starts and the bot modules are imported only once
+PYTEST_FILES = [
+    'test_channel_filter_fix.py',
+    'test_message_reception.py',
+    'test_multi_channel.py',
+    'test_multi_channel_reply.py',
+    'test_no_channel_filtering.py',
+    'test_viewlogs.py',
+    'test_weather_bot.py',
+    'test_weather_channel_filtering.py',
+    'test_weather_channel_reply.py',
+]
+
+def run_test(test_file, cmd=None):
+    """Run a single test file (or the given command) and return result"""
     print(f"\n{'='*70}")
     print(f"Running: {test_file}")
     print('='*70)
@@ -40,7 +59,7 @@ def run_test(test_file):
     start_time = time.time()
     try:
         result = subprocess.run(
-            ['python3', test_file],
+            cmd or ['python3', test_file],
             capture_output=True,
             text=True,
             timeout=60
@@ -80,6 +99,24 @@ def main():
         results.append((test_file, passed, elapsed))
         total_time += elapsed
     
+    pytest_label = "pytest: " + " ".join(PYTEST_FILES)
+    if PYTEST_AVAILABLE:
+        # Parametrized cases are independent, so spread them across cores when
+        # pytest-xdist is installed. Use this interpreter, the one the
+        # pytest/xdist checks above ran in.
+        pytest_cmd = [sys.executable, '-m', 'pytest', '-q']
+        if XDIST_AVAILABLE:
+            pytest_cmd += ['-n', 'auto']
+        passed, elapsed = run_test(pytest_label, pytest_cmd + PYTEST_FILES)
+    else:
+        print(f"\n{'='*70}")
+        print(f"Skipping: {pytest_label}")
+        print('='*70)
+        print("✗ pytest is not installed. Install with: pip install -r requirements-dev.txt")
+        passed, elapsed = False, 0.0
+    results.append((pytest_label, passed, elapsed))
+    total_time += elapsed
+    
     # Summary
     print("\n" + "="*70)
     print("TEST SUMMARY")
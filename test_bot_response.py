@@ -72,7 +72,7 @@ def simulate_weather_request():
     print()
     
     # Create weather bot with mock
-    with patch('weather_bot.requests.get') as mock_get:
+    with patch('weather_bot._SESSION.get') as mock_get:
         # Mock geocoding response
         geocoding_response = MagicMock()
         geocoding_response.json.return_value = {
@@ -131,11 +131,7 @@ def simulate_weather_request():
 
 def main():
     """Run all simulations"""
-    print("\n")
-    print("╔" + "=" * 68 + "╗")
-    print("║" + " " * 15 + "Weather Bot Frame Handling Demo" + " " * 22 + "║")
-    print("╚" + "=" * 68 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 68}╗\n║{'Weather Bot Frame Handling Demo':^68}║\n╚{'=' * 68}╝\n")
     print("This demonstrates the fix for the reported issue:")
     print("  [2026-02-20 23:32:01] MeshCore [WX_BOT]: unhandled frame code 0x05")
     print("  [2026-02-20 23:32:12] MeshCore [WX_BOT]: unhandled frame code 0x88")
@@ -4,6 +4,8 @@ Test script for MeshCore Channel functionality
 Tests channel broadcasting and filtering
 """
 
+import copy
+import pickle
 import sys
 from meshcore import MeshCore, MeshCoreMessage
 
@@ -43,6 +45,31 @@ def test_message_with_channel():
     assert msg4.channel is None
     print("✓ from_dict without channel: channel is None")
 
+    # Messages are immutable, so to_json() is computed once and reused
+    assert msg2.to_json() is msg2.to_json()
+    assert MeshCoreMessage.from_json(msg2.to_json()).channel == "weather"
+    try:
+        msg2.channel = "news"
+        assert False, "Setting an attribute on a message should raise AttributeError"
+    except AttributeError:
+        pass
+    print("✓ to_json cached on immutable message")
+
+    # replace() copies into a new message rather than mutating
+    msg5 = msg2.replace(channel="news", channel_idx=2)
+    assert (msg5.channel, msg5.channel_idx) == ("news", 2)
+    assert (msg5.sender, msg5.content, msg5.timestamp) == (msg2.sender, msg2.content, msg2.timestamp)
+    assert msg2.channel == "weather"
+    print("✓ replace returns a modified copy")
+
+    # copy, deepcopy and pickle rebuild the message instead of setting slots
+    msg6 = msg5.replace(content="wx leeds")
+    msg6.to_json()
+    for clone in (copy.copy(msg6), copy.deepcopy(msg6), pickle.loads(pickle.dumps(msg6))):
+        assert clone.to_dict() == msg6.to_dict()
+        assert clone.to_json() == msg6.to_json()
+    print("✓ copy, deepcopy and pickle round-trip")
+
     print()
 
 
@@ -139,6 +166,37 @@ def test_channel_filtering():
     print()
 
 
+def test_suppress_duplicates():
+    """Test that re-delivered messages are dropped only when enabled"""
+    received_messages = []
+    msg = MeshCoreMessage("sender", "wx Leeds", "text", timestamp=1771711343, channel_idx=1)
+
+    mesh = MeshCore("test_node", debug=False, suppress_duplicates=True)
+    mesh.register_handler("text", received_messages.append)
+    mesh.receive_message(msg)
+    mesh.receive_message(msg)  # re-delivery → dropped
+    mesh.receive_message(msg.replace(timestamp=1771711400))  # repeated request → accepted
+    assert len(received_messages) == 2
+
+    # Binary re-deliveries carry the sender's original frame timestamp
+    received_messages.clear()
+    frame = bytes([0x08, 1, 0, 0]) + (1771711500).to_bytes(4, "little") + b"sender: wx Leeds"
+    mesh._parse_binary_frame(frame)
+    mesh._parse_binary_frame(frame)  # re-delivery → dropped
+    assert len(received_messages) == 1
+    # ...while the message itself keeps its receive time
+    assert received_messages[0].timestamp != 1771711500
+
+    received_messages.clear()
+    mesh = MeshCore("test_node", debug=False)
+    mesh.register_handler("text", received_messages.append)
+    mesh.receive_message(msg)
+    mesh.receive_message(msg)
+    assert len(received_messages) == 2
+    print("✓ Duplicates suppressed only with suppress_duplicates=True")
+    print()
+
+
 def test_weather_bot_with_channel():
     """Test WeatherBot with channel support"""
     print("=" * 60)
@@ -219,16 +277,13 @@ def test_json_serialization():
 
 def main():
     """Run all tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 10 + "MeshCore Channel Functionality Tests" + " " * 10 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 58}╗\n║{'MeshCore Channel Functionality Tests':^58}║\n╚{'=' * 58}╝\n")
 
     try:
         test_message_with_channel()
         test_send_message_with_channel()
         test_channel_filtering()
+        test_suppress_duplicates()
         test_weather_bot_with_channel()
         test_meshcore_send_integration()
         test_json_serialization()
@@ -121,9 +121,7 @@ def test_filter_logs_rejection():
 
 def main():
     """Run all tests."""
-    print("\n╔" + "="*68 + "╗")
-    print("║" + " "*18 + "Channel Index Filter Tests" + " "*24 + "║")
-    print("╚" + "="*68 + "╝")
+    print(f"\n╔{'=' * 68}╗\n║{'Channel Index Filter Tests':^68}║\n╚{'=' * 68}╝")
     
     try:
         test1 = test_no_filter()
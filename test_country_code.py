@@ -6,45 +6,49 @@ from unittest.mock import MagicMock, patch
 from weather_bot import WeatherBot
 
 
-def test_country_code_shortening():
+def _make_mocks(geocoding, weather):
+    """Build the geocoding and weather HTTP responses, in call order"""
+    geocoding_response = MagicMock()
+    geocoding_response.json.return_value = geocoding
+    weather_response = MagicMock()
+    weather_response.json.return_value = weather
+    return [geocoding_response, weather_response]
+
+
+def test_country_code_shortening(wx_bot):
     """Test that country codes are used instead of full country names"""
     print("=" * 70)
     print("TEST: Country Code Shortening")
     print("=" * 70)
     
-    bot = WeatherBot(debug=False)
-    
-    with patch('weather_bot.requests.get') as mock_get:
+    with patch('weather_bot._SESSION.get') as mock_get:
         # Mock geocoding response with both country and country_code
-        geocoding_response = MagicMock()
-        geocoding_response.json.return_value = {
-            "results": [{
-                "name": "London",
-                "country": "United Kingdom",
-                "country_code": "GB",
-                "latitude": 51.5074,
-                "longitude": -0.1278
-            }]
-        }
-        
-        # Mock weather response
-        weather_response = MagicMock()
-        weather_response.json.return_value = {
-            "current": {
-                "temperature_2m": 14.2,
-                "apparent_temperature": 12.8,
-                "relative_humidity_2m": 72,
-                "wind_speed_10m": 18.0,
-                "wind_direction_10m": 230,
-                "precipitation": 0.0,
-                "weather_code": 2
-            }
-        }
-        
-        mock_get.side_effect = [geocoding_response, weather_response]
+        mock_get.side_effect = _make_mocks(
+            {
+                "results": [{
+                    "name": "London",
+                    "country": "United Kingdom",
+                    "country_code": "GB",
+                    "latitude": 51.5074,
+                    "longitude": -0.1278
+                }]
+            },
+            # Mock weather response
+            {
+                "current": {
+                    "temperature_2m": 14.2,
+                    "apparent_temperature": 12.8,
+                    "relative_humidity_2m": 72,
+                    "wind_speed_10m": 18.0,
+                    "wind_direction_10m": 230,
+                    "precipitation": 0.0,
+                    "weather_code": 2
+                }
+            },
+        )
         
         # Get weather
-        result = bot._get_weather("London")
+        result = wx_bot._get_weather("London")
         
         print("\nResult:")
         print(result)
@@ -73,44 +77,39 @@ def test_country_code_shortening():
         return True
 
 
-def test_fallback_to_full_name():
+def test_fallback_to_full_name(wx_bot):
     """Test fallback when country_code is not available"""
     print("\n" + "=" * 70)
     print("TEST: Fallback to Full Country Name")
     print("=" * 70)
     
-    bot = WeatherBot(debug=False)
-    
-    with patch('weather_bot.requests.get') as mock_get:
+    with patch('weather_bot._SESSION.get') as mock_get:
         # Mock geocoding response WITHOUT country_code
-        geocoding_response = MagicMock()
-        geocoding_response.json.return_value = {
-            "results": [{
-                "name": "Paris",
-                "country": "France",
-                "latitude": 48.8566,
-                "longitude": 2.3522
-            }]
-        }
-        
-        # Mock weather response
-        weather_response = MagicMock()
-        weather_response.json.return_value = {
-            "current": {
-                "temperature_2m": 16.5,
-                "apparent_temperature": 15.2,
-                "relative_humidity_2m": 68,
-                "wind_speed_10m": 12.0,
-                "wind_direction_10m": 180,
-                "precipitation": 0.0,
-                "weather_code": 1
-            }
-        }
-        
-        mock_get.side_effect = [geocoding_response, weather_response]
+        mock_get.side_effect = _make_mocks(
+            {
+                "results": [{
+                    "name": "Paris",
+                    "country": "France",
+                    "latitude": 48.8566,
+                    "longitude": 2.3522
+                }]
+            },
+            # Mock weather response
+            {
+                "current": {
+                    "temperature_2m": 16.5,
+                    "apparent_temperature": 15.2,
+                    "relative_humidity_2m": 68,
+                    "wind_speed_10m": 12.0,
+                    "wind_direction_10m": 180,
+                    "precipitation": 0.0,
+                    "weather_code": 1
+                }
+            },
+        )
         
         # Get weather
-        result = bot._get_weather("Paris")
+        result = wx_bot._get_weather("Paris")
         
         print("\nResult:")
         print(result)
@@ -131,8 +130,9 @@ if __name__ == "__main__":
     print("║          Country Code Shortening Tests                            ║")
     print("╚════════════════════════════════════════════════════════════════════╝\n")
     
-    test1_passed = test_country_code_shortening()
-    test2_passed = test_fallback_to_full_name()
+    bot = WeatherBot(debug=False)
+    test1_passed = test_country_code_shortening(bot)
+    test2_passed = test_fallback_to_full_name(bot)
     
     print("\n" + "=" * 70)
     print("SUMMARY")
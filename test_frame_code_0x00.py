@@ -141,11 +141,7 @@ def test_no_unhandled_error_logged():
 
 def main():
     """Run all frame code 0x00 tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 15 + "Frame Code 0x00 Tests" + " " * 22 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 58}╗\n║{'Frame Code 0x00 Tests':^58}║\n╚{'=' * 58}╝\n")
     
     try:
         # Run tests
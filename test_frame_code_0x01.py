@@ -187,11 +187,7 @@ def test_app_start_during_init():
 
 def main():
     """Run all frame code 0x01 tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 15 + "Frame Code 0x01 Tests" + " " * 22 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 58}╗\n║{'Frame Code 0x01 Tests':^58}║\n╚{'=' * 58}╝\n")
     
     try:
         # Run tests
@@ -179,11 +179,7 @@ def test_no_unhandled_errors():
 
 def main():
     """Run all frame code tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 12 + "Frame Code Handler Tests" + " " * 22 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 58}╗\n║{'Frame Code Handler Tests':^58}║\n╚{'=' * 58}╝\n")
 
     try:
         # Run tests
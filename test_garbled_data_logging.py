@@ -4,18 +4,27 @@ Test to verify that garbled LoRa data is NOT logged with "LoRa RX:"
 This addresses the issue where corrupted data was showing up in logs.
 """
 
+import os
 import sys
+import traceback
 import io
 from contextlib import redirect_stdout
 from unittest.mock import MagicMock
 from meshcore import MeshCore, MeshCoreMessage
 
 
+# Banner pieces, built once
+_RULE = "=" * 60
+_BOX_TOP = "╔" + "=" * 58 + "╗"
+_BOX_BOTTOM = "╚" + "=" * 58 + "╝"
+_BOX_TITLE = "║" + " " * 10 + "Garbled Data Logging Fix Test" + " " * 18 + "║"
+
+
 def test_garbled_data_not_logged():
     """Test that garbled data doesn't show up in LoRa RX logs"""
-    print("=" * 60)
+    print(_RULE)
     print("TEST: Garbled Data Logging Fix")
-    print("=" * 60)
+    print(_RULE)
 
     mesh = MeshCore("WX_BOT", debug=True)
     mesh.running = True
@@ -76,9 +85,9 @@ def test_garbled_data_not_logged():
     # The message should now be silently skipped (no "Ignoring" message)
     ignoring_message_present = 'Ignoring non-JSON LoRa data' in output
     
-    print("\n" + "=" * 60)
+    print("\n" + _RULE)
     print("RESULTS:")
-    print("=" * 60)
+    print(_RULE)
     print(f"✓ Garbled data in 'LoRa RX:' log: {garbled_in_lora_rx} (should be False)")
     print(f"✓ Valid JSON in 'LoRa RX:' log: {valid_in_lora_rx} (should be True)")
     print(f"✓ 'Ignoring non-JSON' message present: {ignoring_message_present} (should be False - silently skipped)")
@@ -91,20 +100,28 @@ def test_garbled_data_not_logged():
     print()
 
 
+def _report(e):
+    """Show a failure: the full traceback with MCWB_TEST_VERBOSE set, else one line"""
+    if os.getenv("MCWB_TEST_VERBOSE"):
+        traceback.print_exc()
+    else:
+        print(f"{type(e).__name__}: {e} (set MCWB_TEST_VERBOSE=1 for the traceback)")
+
+
 def main():
     """Run the test"""
     print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 10 + "Garbled Data Logging Fix Test" + " " * 18 + "║")
-    print("╚" + "=" * 58 + "╝")
+    print(_BOX_TOP)
+    print(_BOX_TITLE)
+    print(_BOX_BOTTOM)
     print()
 
     try:
         test_garbled_data_not_logged()
         
-        print("=" * 60)
+        print(_RULE)
         print("✅ Test passed!")
-        print("=" * 60)
+        print(_RULE)
         print()
         print("The fix successfully prevents garbled LoRa data from")
         print("appearing in logs entirely - it's now silently skipped")
@@ -115,13 +132,11 @@ def main():
         
     except AssertionError as e:
         print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report(e)
         return 1
     except Exception as e:
         print(f"\n❌ Error during testing: {e}")
-        import traceback
-        traceback.print_exc()
+        _report(e)
         return 1
 
 
@@ -4,16 +4,25 @@ Test script to verify that edge cases in LoRa message parsing are handled correc
 This specifically tests the fix for "Expecting value: line 1 column 1 (char 0)" errors.
 """
 
+import os
 import sys
+import traceback
 from unittest.mock import MagicMock
 from meshcore import MeshCore, MeshCoreMessage
 
 
+# Banner pieces, built once
+_RULE = "=" * 60
+_BOX_TOP = "╔" + "=" * 58 + "╗"
+_BOX_BOTTOM = "╚" + "=" * 58 + "╝"
+_BOX_TITLE = "║" + " " * 8 + "JSON Parsing Edge Case Tests" + " " * 21 + "║"
+
+
 def test_malformed_json_lines():
     """Test that various malformed inputs don't crash the listener"""
-    print("=" * 60)
+    print(_RULE)
     print("TEST: Malformed JSON and Edge Cases")
-    print("=" * 60)
+    print(_RULE)
 
     received = []
 
@@ -70,9 +79,9 @@ def test_malformed_json_lines():
 
 def test_json_with_control_characters_before_brace():
     """Test that lines with control characters before { are handled"""
-    print("=" * 60)
+    print(_RULE)
     print("TEST: Control Characters Before Opening Brace")
-    print("=" * 60)
+    print(_RULE)
 
     received = []
 
@@ -117,9 +126,9 @@ def test_json_with_control_characters_before_brace():
 
 def test_empty_json_object():
     """Test that empty JSON objects {} are handled"""
-    print("=" * 60)
+    print(_RULE)
     print("TEST: Empty JSON Object")
-    print("=" * 60)
+    print(_RULE)
 
     mesh = MeshCore("test_node", debug=False)
     mesh.running = True
@@ -151,12 +160,20 @@ def test_empty_json_object():
     print()
 
 
+def _report(e):
+    """Show a failure: the full traceback with MCWB_TEST_VERBOSE set, else one line"""
+    if os.getenv("MCWB_TEST_VERBOSE"):
+        traceback.print_exc()
+    else:
+        print(f"{type(e).__name__}: {e} (set MCWB_TEST_VERBOSE=1 for the traceback)")
+
+
 def main():
     """Run all edge case tests"""
     print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 8 + "JSON Parsing Edge Case Tests" + " " * 21 + "║")
-    print("╚" + "=" * 58 + "╝")
+    print(_BOX_TOP)
+    print(_BOX_TITLE)
+    print(_BOX_BOTTOM)
     print()
 
     try:
@@ -164,9 +181,9 @@ def main():
         test_json_with_control_characters_before_brace()
         test_empty_json_object()
 
-        print("=" * 60)
+        print(_RULE)
         print("✅ All edge case tests passed!")
-        print("=" * 60)
+        print(_RULE)
         print()
         print("The fix successfully prevents:")
         print("  • 'Expecting value: line 1 column 1 (char 0)' errors")
@@ -178,13 +195,11 @@ def main():
 
     except AssertionError as e:
         print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report(e)
         return 1
     except Exception as e:
         print(f"\n❌ Error during testing: {e}")
-        import traceback
-        traceback.print_exc()
+        _report(e)
         return 1
 
 
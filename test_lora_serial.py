@@ -7,8 +7,26 @@ physical LoRa hardware attached.
 
 import sys
 import json
+import html
+import asyncio
+import threading
+from collections import deque
 from unittest.mock import MagicMock, patch
 from meshcore import MeshCore, MeshCoreMessage
+from conftest import FakeSerial
+
+
+def _scripted_readline(mock_serial, mesh, lines):
+    """Make mock_serial.readline() return *lines* in order, then stop the listen loop."""
+    pending = deque(lines)
+
+    def readline():
+        if pending:
+            return pending.popleft()
+        mesh.running = False  # signal loop to exit
+        return b""
+
+    mock_serial.readline.side_effect = readline
 
 
 def test_meshcore_serial_params():
@@ -37,44 +55,43 @@ def test_send_over_lora():
     print("TEST 2: Send Message Over LoRa")
     print("=" * 60)
 
-    mock_serial = MagicMock()
-    mock_serial.is_open = True
+    fake_serial = FakeSerial()
 
     mesh = MeshCore("lora_sender", serial_port="/dev/ttyUSB0", debug=False)
-    mesh._serial = mock_serial  # inject mock
+    mesh._serial = fake_serial  # inject fake
     mesh.running = True
 
     mesh.send_message("wx York", "text", channel="weather")
 
     # Verify serial.write was called with a binary MeshCore companion protocol frame
-    assert mock_serial.write.called, "serial.write should have been called"
-    # After our fix, write is called twice: once for the message, once for CMD_SYNC_NEXT_MSG
-    assert mock_serial.write.call_count == 2, "write should be called twice (message + sync)"
+    assert fake_serial.writes, "serial.write should have been called"
+    # The message and its CMD_SYNC_NEXT_MSG follow-up go out in a single write
+    assert len(fake_serial.writes) == 1, "write should be called once (message + sync)"
     
-    # Check the first call (the actual message)
-    written_bytes = mock_serial.write.call_args_list[0][0][0]
+    # One zero-copy view over the write; check bytes by integer index
+    data = fake_serial.writes[0]
+    mv = memoryview(data)
+    length = mv[1] | (mv[2] << 8)
+    sync = 3 + length  # offset of the trailing sync frame
 
     # Frame format (app→radio):  0x3C '<' + uint16_LE(length) + payload
-    assert written_bytes[0:1] == b'\x3c', "Frame must start with '<' (0x3C) inbound marker"
-    length = int.from_bytes(written_bytes[1:3], "little")
-    assert len(written_bytes) == 3 + length, "Frame length field must match actual payload size"
+    assert mv[0] == 0x3C, "Frame must start with '<' (0x3C) inbound marker"
 
     # Payload: CMD_SEND_CHANNEL_TXT_MSG(1) + txt_type(1) + channel_idx(1) + ts(4) + text
-    payload = written_bytes[3:]
-    assert payload[0] == 3, "Payload must begin with CMD_SEND_CHANNEL_TXT_MSG (3)"
-    assert payload[1] == 0, "txt_type must be 0 (plain text)"
+    assert mv[3] == 3, "Payload must begin with CMD_SEND_CHANNEL_TXT_MSG (3)"
+    assert mv[4] == 0, "txt_type must be 0 (plain text)"
     # Channel 'weather' should be mapped to channel_idx 1 (not 0, which is for default/None)
-    assert payload[2] == 1, "channel_idx must be 1 (weather channel)"
-    text = payload[7:].decode("utf-8")
+    assert mv[5] == 1, "channel_idx must be 1 (weather channel)"
+    text = str(mv[10:sync], "utf-8")
     assert text == "wx York", f"Message text mismatch: expected 'wx York', got '{text}'"
     print("✓ send_message writes binary CMD_SEND_CHANNEL_TXT_MSG frame to serial port")
-    print(f"  Frame (hex): {written_bytes.hex()}")
+    print(f"  Frame (hex): {mv[:sync].hex()}")
     print(f"  Channel 'weather' mapped to channel_idx=1")
     
-    # Check the second call (CMD_SYNC_NEXT_MSG)
-    sync_bytes = mock_serial.write.call_args_list[1][0][0]
-    assert sync_bytes[0:1] == b'\x3c', "Sync frame must start with '<' (0x3C)"
-    assert sync_bytes[3:4] == b'\x0a', "Second call must be CMD_SYNC_NEXT_MSG (0x0A)"
+    # Check the trailing frame (CMD_SYNC_NEXT_MSG)
+    assert len(mv) == sync + 4, "Sync frame must follow the message frame"
+    assert mv[sync] == 0x3C, "Sync frame must start with '<' (0x3C)"
+    assert mv[sync + 3] == 0x0A, "Trailing frame must be CMD_SYNC_NEXT_MSG (0x0A)"
     print("✓ send_message follows up with CMD_SYNC_NEXT_MSG to complete protocol exchange")
 
     print()
@@ -86,17 +103,16 @@ def test_send_without_channel():
     print("TEST 2b: Send Message Without Channel")
     print("=" * 60)
 
-    mock_serial = MagicMock()
-    mock_serial.is_open = True
+    fake_serial = FakeSerial()
 
     mesh = MeshCore("lora_sender", serial_port="/dev/ttyUSB0", debug=False)
-    mesh._serial = mock_serial
+    mesh._serial = fake_serial
     mesh.running = True
 
     mesh.send_message("broadcast message", "text", channel=None)
 
     # Check the first call (the actual message)
-    written_bytes = mock_serial.write.call_args_list[0][0][0]
+    written_bytes = fake_serial.writes[0]
     payload = written_bytes[3:]
     # Verify channel_idx is 0 for no-channel (broadcast)
     assert payload[2] == 0, "channel_idx must be 0 for broadcast (no channel)"
@@ -145,16 +161,8 @@ def test_receive_message_from_lora():
     mock_serial = MagicMock()
     mock_serial.is_open = True
 
-    # After the JSON line, stop the loop by clearing running flag
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count == 1:
-            return json_line
-        mesh.running = False  # signal loop to exit
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    # After the JSON line, the helper stops the loop by clearing running flag
+    _scripted_readline(mock_serial, mesh, [json_line])
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -194,15 +202,7 @@ def test_invalid_lora_data_ignored():
         (valid_msg.to_json() + "\n").encode("utf-8"),
     ]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -214,6 +214,33 @@ def test_invalid_lora_data_ignored():
     print()
 
 
+def test_long_line_split_across_reads():
+    """Test that a text line longer than a binary frame survives split reads"""
+    print("=" * 60)
+    print("TEST 5b: Long Line Split Across Serial Reads")
+    print("=" * 60)
+
+    received = []
+    mesh = MeshCore("bot_node", debug=False)
+    mesh.register_handler("text", received.append)
+
+    long_msg = MeshCoreMessage("sender", "wx " + "Llanfair" * 60, "text")
+    line = (long_msg.to_json() + "\n").encode("utf-8")
+    assert len(line) > 300
+
+    buf = bytearray()
+    for start in range(0, len(line), 64):
+        buf.extend(line[start:start + 64])
+        mesh._feed_rx_buffer(buf)
+
+    assert len(received) == 1, f"Expected 1 message, got {len(received)}"
+    assert received[0].content == long_msg.content
+    assert not buf
+    print(f"✓ {len(line)}-byte line reassembled from 64-byte reads")
+
+    print()
+
+
 def test_binary_control_chars_sanitized():
     """Test that binary LoRa data with embedded control characters is handled safely"""
     print("=" * 60)
@@ -245,21 +272,16 @@ def test_binary_control_chars_sanitized():
         (valid_msg.to_json() + "\n").encode("utf-8"),
     ]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
-    mesh._listen_loop()
+    with patch("meshcore.html.unescape", wraps=html.unescape) as mock_unescape:
+        mesh._listen_loop()
 
     assert len(received) == 1, f"Expected 1 valid message, got {len(received)}"
     assert received[0].content == "wx York"
+    assert mock_unescape.call_count == 0, \
+        "Noise lines should be rejected before decoding, and plain JSON needs no unescaping"
     print("✓ Binary data with control characters handled safely; valid message dispatched")
 
     print()
@@ -292,15 +314,7 @@ def test_channel_filter_applied_to_lora_messages():
         (news_msg.to_json() + "\n").encode("utf-8"),
     ]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -323,8 +337,8 @@ def test_start_stop_with_mock_serial():
 
         mock_port = MagicMock()
         mock_port.is_open = True
-        # readline returns empty to let listener thread idle
-        mock_port.readline.return_value = b""
+        # No data waiting: the listener thread idles in its poll wait
+        mock_port.in_waiting = 0
         mock_serial_module.Serial.return_value = mock_port
         mock_serial_module.SerialException = Exception
 
@@ -338,8 +352,11 @@ def test_start_stop_with_mock_serial():
         assert mesh._listener_thread.is_alive()
         print("✓ start() opens serial port and spawns listener thread")
 
+        listener = mesh._listener_thread
         mesh.stop()
         assert not mesh.running
+        listener.join(timeout=0.2)
+        assert not listener.is_alive(), "Idle listener thread should exit promptly after stop()"
         print("✓ stop() sets running=False and closes serial port")
 
     print()
@@ -438,6 +455,43 @@ def _build_push_msg_waiting_frame() -> bytes:
     return _build_binary_frame(bytes([0x83]))
 
 
+def test_noise_before_binary_frames():
+    """Test that a stray byte before binary frames does not hold them back"""
+    print("=" * 60)
+    print("TEST 10b: Noise Before Binary Frames")
+    print("=" * 60)
+
+    received = []
+    mesh = MeshCore("bot_node", debug=False)
+    mesh.register_handler("text", received.append)
+
+    # NO_MORE_MSGS (code 0x0A) contains the newline byte
+    data = (b"\x07" + _build_channel_msg_frame("a: wx Leeds", channel_idx=1)
+            + _build_channel_msg_frame("b: wx York", channel_idx=2)
+            + _build_binary_frame(bytes([0x0A])))
+
+    for chunk_size in (len(data), 1):
+        received.clear()
+        buf = bytearray()
+        for start in range(0, len(data), chunk_size):
+            buf.extend(data[start:start + chunk_size])
+            mesh._feed_rx_buffer(buf)
+
+        assert [m.content for m in received] == ["wx Leeds", "wx York"], \
+            f"Frames lost behind noise with {chunk_size}-byte reads"
+        assert not buf
+    print("✓ Leading noise is skipped and the following frames are dispatched")
+
+    # '>' inside a text line is not mistaken for a frame header
+    received.clear()
+    buf = bytearray(b'{"sender": "a", "content": "temp > 5", "type": "text"}\n')
+    mesh._feed_rx_buffer(buf)
+    assert [m.content for m in received] == ["temp > 5"]
+    print("✓ '>' inside a text line is kept")
+
+    print()
+
+
 def test_receive_binary_channel_message():
     """Test that a binary CHANNEL_MSG_RECV frame from a MeshCore device is processed"""
     print("=" * 60)
@@ -462,15 +516,7 @@ def test_receive_binary_channel_message():
 
     lines = [frame]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -506,15 +552,7 @@ def test_receive_binary_channel_message_no_sender_prefix():
 
     lines = [frame]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -540,15 +578,7 @@ def test_push_msg_waiting_triggers_sync():
 
     lines = [_build_push_msg_waiting_frame()]
 
-    def readline_side_effect():
-        readline_side_effect.count += 1
-        if readline_side_effect.count <= len(lines):
-            return lines[readline_side_effect.count - 1]
-        mesh.running = False
-        return b""
-
-    readline_side_effect.count = 0
-    mock_serial.readline.side_effect = lambda: readline_side_effect()
+    _scripted_readline(mock_serial, mesh, lines)
     mesh._serial = mock_serial
 
     mesh._listen_loop()
@@ -591,13 +621,103 @@ def test_connect_serial_sends_app_start():
     print()
 
 
+def _send_from_thread(mesh, text):
+    """Send a channel message from a short-lived thread, as a handler thread would"""
+    sender = threading.Thread(target=mesh.send_message, args=(text,), kwargs={"channel_idx": 2})
+    sender.start()
+    sender.join()
+
+
+def test_start_stop_async():
+    """Test start_async/stop lifecycle with a mocked pyserial-asyncio transport"""
+    print("=" * 60)
+    print("TEST 15: Start/Stop Lifecycle with asyncio Serial Reader")
+    print("=" * 60)
+
+    received = []
+
+    def handler(message):
+        received.append(message)
+
+    with patch("meshcore.SERIAL_ASYNCIO_AVAILABLE", True), \
+         patch("meshcore.serial_asyncio", create=True) as mock_serial_asyncio:
+
+        mock_transport = MagicMock()
+        mock_transport.is_closing.return_value = False
+        connection = {}
+
+        async def create_serial_connection(loop, protocol_factory, port, **kwargs):
+            connection["protocol"] = protocol_factory()
+            connection["port"] = port
+            connection["kwargs"] = kwargs
+            return mock_transport, connection["protocol"]
+
+        mock_serial_asyncio.create_serial_connection = create_serial_connection
+
+        mesh = MeshCore("lora_bot", serial_port="/dev/ttyUSB0", baud_rate=9600, debug=False)
+        mesh.register_handler("text", handler)
+
+        async def scenario():
+            await mesh.start_async()
+            # Deliver a binary channel message split across two serial reads
+            frame = _build_channel_msg_frame("Tim Bristol: wx London", channel_idx=2)
+            connection["protocol"].data_received(frame[:5])
+            assert len(received) == 0, "Partial frame must not be dispatched"
+            connection["protocol"].data_received(frame[5:])
+            # Replies sent in one burst are drained as a single transport write
+            writes_before = mock_transport.write.call_count
+            mesh.send_message("reply 1", channel_idx=2)
+            mesh.send_message("reply 2", channel_idx=2)
+            await asyncio.sleep(0)
+            assert mock_transport.write.call_count == writes_before + 1, \
+                "Queued replies should be batched into one write"
+            batch = mock_transport.write.call_args[0][0]
+            assert b"reply 1" in batch and b"reply 2" in batch
+            # A reply sent from another thread is handed to the loop rather
+            # than queued from the foreign thread...
+            written = asyncio.get_running_loop().create_future()
+            mock_transport.write.side_effect = \
+                lambda data: written.done() or written.set_result(data)
+            _send_from_thread(mesh, "threaded reply")
+            assert mesh._serial._outq.empty(), "Off-loop write touched the queue directly"
+            # ...and the loop wakes up to write it (the timeout only guards a hang)
+            assert b"threaded reply" in await asyncio.wait_for(written, timeout=5)
+            mock_transport.write.side_effect = None
+            # stop() still sends a reply another thread handed over just before
+            _send_from_thread(mesh, "last reply")
+            mesh.stop()
+            await asyncio.sleep(0)
+            assert b"last reply" in mock_transport.write.call_args[0][0], \
+                "Reply handed over before stop() was lost"
+
+        asyncio.run(scenario())
+
+        assert connection["port"] == "/dev/ttyUSB0"
+        assert connection["kwargs"] == {"baudrate": 9600, "rtscts": False, "dsrdtr": False}
+        assert mock_transport.serial.rts is False, "RTS should be deasserted (False)"
+        assert mock_transport.serial.dtr is False, "DTR should be deasserted (False)"
+        first_write = mock_transport.write.call_args_list[0][0][0]
+        assert first_write[3:4] == b'\x01', "First command byte must be CMD_APP_START (0x01)"
+        print("✓ start_async() opens the serial transport and sends CMD_APP_START")
+
+        assert len(received) == 1, f"Expected 1 message, got {len(received)}"
+        assert received[0].sender == "Tim Bristol"
+        assert received[0].content == "wx London"
+        assert received[0].channel_idx == 2
+        print("✓ Frames split across reads are reassembled and dispatched")
+        print("✓ Queued replies are batched into a single transport write")
+        print("✓ Replies sent from another thread wake the loop and are written")
+
+        assert not mesh.running
+        mock_transport.close.assert_called_once()
+        print("✓ stop() flushes pending replies, sets running=False and closes the transport")
+
+    print()
+
+
 def main():
     """Run all LoRa serial tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 12 + "MeshCore LoRa Serial Tests" + " " * 19 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
+    print(f"\n\n╔{'=' * 58}╗\n║{'MeshCore LoRa Serial Tests':^58}║\n╚{'=' * 58}╝\n")
 
     try:
         test_meshcore_serial_params()
@@ -606,16 +726,19 @@ def main():
         test_simulation_mode_no_write()
         test_receive_message_from_lora()
         test_invalid_lora_data_ignored()
+        test_long_line_split_across_reads()
         test_binary_control_chars_sanitized()
         test_channel_filter_applied_to_lora_messages()
         test_start_stop_with_mock_serial()
         test_rts_dtr_deasserted_after_connect()
         test_invalid_baud_rate_rejected()
         test_valid_baud_rates_accepted()
+        test_noise_before_binary_frames()
         test_receive_binary_channel_message()
         test_receive_binary_channel_message_no_sender_prefix()
         test_push_msg_waiting_triggers_sync()
         test_connect_serial_sends_app_start()
+        test_start_stop_async()
 
         print("=" * 60)
         print("✅ All LoRa serial tests passed!")
@@ -12,6 +12,31 @@ from weather_bot import WeatherBot
 from meshcore import MeshCoreMessage
 from unittest.mock import MagicMock, patch
 
+# Mocked Open-Meteo responses, built once and reused by every run of the scenario
+_GEO_MOCK = MagicMock()
+_GEO_MOCK.json.return_value = {
+    "results": [{
+        "name": "Brighton",
+        "country": "United Kingdom",
+        "country_code": "GB",
+        "latitude": 50.82838,
+        "longitude": -0.13947
+    }]
+}
+
+_WX_MOCK = MagicMock()
+_WX_MOCK.json.return_value = {
+    "current": {
+        "temperature_2m": 9.3,
+        "apparent_temperature": 6.9,
+        "relative_humidity_2m": 93,
+        "wind_speed_10m": 13.6,
+        "wind_direction_10m": 253,
+        "precipitation": 0.0,
+        "weather_code": 3
+    }
+}
+
 
 def demonstrate_behavior():
     """Demonstrate the new behavior"""
@@ -22,33 +47,8 @@ def demonstrate_behavior():
     print()
     
     # Mock the API calls
-    with patch('weather_bot.requests.get') as mock_get:
-        # Mock responses
-        geocoding_response = MagicMock()
-        geocoding_response.json.return_value = {
-            "results": [{
-                "name": "Brighton",
-                "country": "United Kingdom",
-                "country_code": "GB",
-                "latitude": 50.82838,
-                "longitude": -0.13947
-            }]
-        }
-        
-        weather_response = MagicMock()
-        weather_response.json.return_value = {
-            "current": {
-                "temperature_2m": 9.3,
-                "apparent_temperature": 6.9,
-                "relative_humidity_2m": 93,
-                "wind_speed_10m": 13.6,
-                "wind_direction_10m": 253,
-                "precipitation": 0.0,
-                "weather_code": 3
-            }
-        }
-        
-        mock_get.side_effect = [geocoding_response, weather_response]
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = iter([_GEO_MOCK, _WX_MOCK])
         
         # Create bot with --channel weather
         print("Starting weather bot with --channel weather")
@@ -126,10 +126,7 @@ def demonstrate_behavior():
 
 def main():
     """Run manual verification"""
-    print()
-    print("╔" + "=" * 68 + "╗")
-    print("║" + " " * 15 + "Manual Verification Scenario" + " " * 25 + "║")
-    print("╚" + "=" * 68 + "╝")
+    print(f"\n╔{'=' * 68}╗\n║{'Manual Verification Scenario':^68}║\n╚{'=' * 68}╝")
     
     try:
         success = demonstrate_behavior()
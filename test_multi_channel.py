@@ -1,288 +1,143 @@
 #!/usr/bin/env python3
 """
-Test script to verify multi-channel broadcast functionality for weather bot.
+Test script to verify multi-channel functionality for weather bot.
 Tests the feature requested in the problem statement:
-"can this bot only transmit to one channel? I tested with alerts channel 
+"can this bot only transmit to one channel? I tested with alerts channel
 but would like it to run on weather channel in meshcore"
+
+The bot addresses the radio's channel slots by channel_idx: it answers on
+every slot unless allowed_channel_idx restricts it to one.
 """
 
+import os
 import sys
-from unittest.mock import MagicMock
-from weather_bot import WeatherBot
-from meshcore import MeshCoreMessage
-
-
-def test_single_channel():
-    """Test bot with single channel (original behavior)"""
-    print("=" * 60)
-    print("TEST: Single Channel Broadcast")
-    print("=" * 60)
-    
-    bot = WeatherBot(node_id="test_bot", debug=False, channel="weather")
-    
-    # Verify channels are parsed correctly
-    assert bot.channels == ["weather"], f"Expected ['weather'], got {bot.channels}"
-    print("✓ Bot initialized with single channel: 'weather'")
-    
-    # Mock the mesh send_message to capture calls
-    sent_messages = []
-    
-    def mock_send(content, msg_type, channel):
-        sent_messages.append({"content": content, "type": msg_type, "channel": channel})
-        return MeshCoreMessage(bot.mesh.node_id, content, msg_type, channel=channel)
-    
-    bot.mesh.send_message = mock_send
-    
-    # Send a response
-    bot.send_response("Test weather message")
-    
-    # Verify message was sent to the correct channel
-    assert len(sent_messages) == 1, f"Expected 1 message, got {len(sent_messages)}"
-    assert sent_messages[0]["channel"] == "weather", f"Expected 'weather' channel"
-    print("✓ Message sent to 'weather' channel")
-    print()
-
-
-def test_multiple_channels():
-    """Test bot with multiple channels (new feature)"""
-    print("=" * 60)
-    print("TEST: Multiple Channel Broadcast")
-    print("=" * 60)
-    
-    # Test with two channels as requested in problem statement
-    bot = WeatherBot(node_id="test_bot", debug=False, channel="weather,alerts")
-    
-    # Verify channels are parsed correctly
-    assert bot.channels == ["weather", "alerts"], f"Expected ['weather', 'alerts'], got {bot.channels}"
-    print("✓ Bot initialized with multiple channels: 'weather', 'alerts'")
-    
-    # Mock the mesh send_message to capture calls
-    sent_messages = []
-    
-    def mock_send(content, msg_type, channel):
-        sent_messages.append({"content": content, "type": msg_type, "channel": channel})
-        return MeshCoreMessage(bot.mesh.node_id, content, msg_type, channel=channel)
-    
-    bot.mesh.send_message = mock_send
-    
-    # Send a response
-    bot.send_response("Test weather message")
-    
-    # Verify message was sent to both channels
+import pytest
+
+
+# Progress output is only printed with MCWB_TEST_VERBOSE set
+log = print if os.getenv("MCWB_TEST_VERBOSE") else (lambda *args, **kwargs: None)
+
+_RULE = "=" * 60
+
+# Fixed weather API responses for the mocked bot
+_GEO = {
+    "results": [{
+        "name": "London",
+        "country_code": "GB",
+        "latitude": 51.5074,
+        "longitude": -0.1278
+    }]
+}
+
+_WX = {
+    "current": {
+        "temperature_2m": 15.5,
+        "apparent_temperature": 14.2,
+        "relative_humidity_2m": 70,
+        "wind_speed_10m": 10.5,
+        "wind_direction_10m": 180,
+        "precipitation": 0.0,
+        "weather_code": 1
+    }
+}
+
+# The bot's report for _GEO and _WX
+_REPORT = (
+    "London, GB\nMainly clear\nTemp: 15.5°C (feels 14.2°C)\n"
+    "Humid: 70%\nWind: 10.5 km/h at 180°\nPrecip: 0.0 mm"
+)
+
+
+def make_capture(writes):
+    """Decode the channel messages in a FakeSerial's writes into (channel_idx, text) pairs"""
+    # 0x3C + len(2) + code(1) + txt_type(1) + channel_idx(1) + timestamp(4) + text
+    return [(frame[5], frame[10:].decode("utf-8")) for frame in writes if frame[3] == 0x03]
+
+
+@pytest.fixture
+def bot(wx_bot, bot_serial, open_meteo, monkeypatch):
+    """Shared bot answering from the fixed API responses, with no channel filter"""
+    open_meteo(_GEO, _WX)
+    monkeypatch.setattr(wx_bot, "allowed_channel_idx", None)
+    return wx_bot
+
+
+def test_single_channel(bot, bot_serial):
+    """Test bot restricted to a single channel slot"""
+    log(f"{_RULE}\nTEST: Single Channel\n{_RULE}")
+
+    bot.allowed_channel_idx = 1
+    log("✓ Bot restricted to channel_idx 1")
+
+    bot._handle_channel_message("user: wx London", 1)
+    bot._handle_channel_message("user: wx London", 2)
+
+    # Only the message on the allowed slot gets a reply
+    sent_messages = make_capture(bot_serial.writes)
+    assert sent_messages == [(1, _REPORT)], f"Expected one reply on channel_idx 1, got {sent_messages}"
+    log("✓ Message sent on channel_idx 1; channel_idx 2 ignored")
+    log()
+
+
+def test_multiple_channels(bot, bot_serial):
+    """Test bot answering on several channel slots"""
+    log(f"{_RULE}\nTEST: Multiple Channels\n{_RULE}")
+
+    bot._handle_channel_message("user: wx London", 1)
+    bot._handle_channel_message("user: wx London", 2)
+
+    # Each request is answered on its own slot
+    sent_messages = make_capture(bot_serial.writes)
     assert len(sent_messages) == 2, f"Expected 2 messages, got {len(sent_messages)}"
-    
-    channels_sent = [msg["channel"] for msg in sent_messages]
-    assert "weather" in channels_sent, "Expected message on 'weather' channel"
-    assert "alerts" in channels_sent, "Expected message on 'alerts' channel"
-    
-    print("✓ Message broadcast to both 'weather' and 'alerts' channels")
-    print()
-
-
-def test_multiple_channels_with_spaces():
-    """Test bot with multiple channels with spaces around commas"""
-    print("=" * 60)
-    print("TEST: Multiple Channels with Spacing")
-    print("=" * 60)
-    
-    # Test with spaces around commas
-    bot = WeatherBot(node_id="test_bot", debug=False, channel="weather, alerts, emergency")
-    
-    # Verify channels are parsed correctly (spaces should be stripped)
-    assert bot.channels == ["weather", "alerts", "emergency"], f"Expected ['weather', 'alerts', 'emergency'], got {bot.channels}"
-    print("✓ Bot correctly parses channels with spaces: 'weather, alerts, emergency'")
-    
-    # Mock the mesh send_message to capture calls
-    sent_messages = []
-    
-    def mock_send(content, msg_type, channel):
-        sent_messages.append({"content": content, "type": msg_type, "channel": channel})
-        return MeshCoreMessage(bot.mesh.node_id, content, msg_type, channel=channel)
-    
-    bot.mesh.send_message = mock_send
-    
-    # Send a response
-    bot.send_response("Test weather message")
-    
-    # Verify message was sent to all three channels
-    assert len(sent_messages) == 3, f"Expected 3 messages, got {len(sent_messages)}"
-    
-    channels_sent = [msg["channel"] for msg in sent_messages]
-    assert "weather" in channels_sent, "Expected message on 'weather' channel"
-    assert "alerts" in channels_sent, "Expected message on 'alerts' channel"
-    assert "emergency" in channels_sent, "Expected message on 'emergency' channel"
-    
-    print("✓ Message broadcast to all 3 channels: 'weather', 'alerts', 'emergency'")
-    print()
-
-
-def test_empty_channel_names():
-    """Test bot with empty channel names in input"""
-    print("=" * 60)
-    print("TEST: Empty Channel Names Handling")
-    print("=" * 60)
-    
-    # Test with empty channel names (should be filtered out with warning)
-    bot = WeatherBot(node_id="test_bot", debug=True, channel="weather,,,alerts")
-    
-    # Verify only valid channels are kept
-    assert bot.channels == ["weather", "alerts"], f"Expected ['weather', 'alerts'], got {bot.channels}"
-    print("✓ Bot correctly filters out empty channel names from 'weather,,,alerts'")
-    print("✓ Warning should have been logged about empty channel names")
-    print()
-
-
-def test_no_channel():
-    """Test bot without channel (broadcast to all)"""
-    print("=" * 60)
-    print("TEST: No Channel (Broadcast to All)")
-    print("=" * 60)
-    
-    bot = WeatherBot(node_id="test_bot", debug=False, channel=None)
-    
-    # Verify no channels are set
-    assert bot.channels == [], f"Expected empty list, got {bot.channels}"
-    print("✓ Bot initialized without channels (broadcast mode)")
-    
-    # Mock the mesh send_message to capture calls
-    sent_messages = []
-    
-    def mock_send(content, msg_type, channel):
-        sent_messages.append({"content": content, "type": msg_type, "channel": channel})
-        return MeshCoreMessage(bot.mesh.node_id, content, msg_type, channel=channel)
-    
-    bot.mesh.send_message = mock_send
-    
-    # Send a response
-    bot.send_response("Test weather message")
-    
-    # Verify message was sent without a channel
-    assert len(sent_messages) == 1, f"Expected 1 message, got {len(sent_messages)}"
-    assert sent_messages[0]["channel"] is None, f"Expected no channel, got {sent_messages[0]['channel']}"
-    print("✓ Message broadcast without channel (to all)")
-    print()
-
-
-def test_problem_statement_scenario():
+
+    channels_sent = [channel_idx for channel_idx, _ in sent_messages]
+    assert channels_sent == [1, 2], f"Expected replies on [1, 2], got {channels_sent}"
+
+    log("✓ Replies sent on both channel_idx 1 and 2")
+    log()
+
+
+def test_no_channel(bot, bot_serial):
+    """Test bot without a channel filter answering on the default slot"""
+    log(f"{_RULE}\nTEST: No Channel Filter\n{_RULE}")
+
+    assert bot.allowed_channel_idx is None
+    log("✓ Bot initialized without a channel filter")
+
+    bot._handle_channel_message("user: wx London", 0)
+
+    sent_messages = make_capture(bot_serial.writes)
+    assert sent_messages == [(0, _REPORT)], f"Expected one reply on channel_idx 0, got {sent_messages}"
+    log("✓ Message sent on the default channel_idx 0")
+    log()
+
+
+def test_problem_statement_scenario(bot, bot_serial):
     """
     Test the exact scenario from the problem statement:
     User wants to use both 'alerts' and 'weather' channels
     """
-    print("=" * 60)
-    print("TEST: Problem Statement Scenario")
-    print("=" * 60)
-    print("User request: 'tested with alerts channel but would like it")
-    print("              to run on weather channel in meshcore'")
-    print()
-    
-    # Create bot with both channels as requested
-    bot = WeatherBot(node_id="weather_bot", debug=False, channel="alerts,weather")
-    
-    print(f"✓ Bot created with channels: {bot.channels}")
-    
-    # Mock the mesh send_message to capture calls
-    sent_messages = []
-    
-    def mock_send(content, msg_type, channel):
-        sent_messages.append({"content": content, "type": msg_type, "channel": channel})
-        return MeshCoreMessage(bot.mesh.node_id, content, msg_type, channel=channel)
-    
-    bot.mesh.send_message = mock_send
-    
-    # Simulate a weather request
-    msg = MeshCoreMessage(
-        sender="user",
-        content="wx London",
-        message_type="text"
-    )
-    
-    # Mock the weather API calls
-    bot.geocode_location = lambda loc: {
-        "name": "London",
-        "country": "GB",
-        "latitude": 51.5074,
-        "longitude": -0.1278
-    }
-    
-    bot.get_weather = lambda lat, lon: {
-        "current": {
-            "temperature_2m": 15.5,
-            "apparent_temperature": 14.2,
-            "relative_humidity_2m": 70,
-            "wind_speed_10m": 10.5,
-            "wind_direction_10m": 180,
-            "precipitation": 0.0,
-            "weather_code": 1
-        }
-    }
-    
-    # Process the weather request directly without starting the event loop
-    bot.handle_message(msg)
-    
-    # Verify message was broadcast to both channels
-    assert len(sent_messages) == 2, f"Expected 2 messages (one per channel), got {len(sent_messages)}"
-    
-    channels_sent = [msg["channel"] for msg in sent_messages]
-    assert "alerts" in channels_sent, "Expected message on 'alerts' channel"
-    assert "weather" in channels_sent, "Expected message on 'weather' channel"
-    
-    print("✓ Weather response broadcast to both 'alerts' and 'weather' channels")
-    print("✓ Bot now supports multiple channels as requested!")
-    print()
-
-
-def main():
-    """Run all multi-channel tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 10 + "Multi-Channel Broadcast Tests" + " " * 18 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
-
-    try:
-        test_single_channel()
-        test_multiple_channels()
-        test_multiple_channels_with_spaces()
-        test_empty_channel_names()
-        test_no_channel()
-        test_problem_statement_scenario()
-
-        print("=" * 60)
-        print("✅ All multi-channel tests passed!")
-        print("=" * 60)
-        print()
-        print("Summary:")
-        print("  • Bot can broadcast to a single channel")
-        print("  • Bot can broadcast to multiple channels simultaneously")
-        print("  • Channel list accepts comma-separated values")
-        print("  • Whitespace around commas is handled correctly")
-        print("  • Empty channel names are filtered out with warning")
-        print("  • Bot can still broadcast without channels (to all)")
-        print()
-        print("Usage examples:")
-        print("  # Single channel:")
-        print("  python3 weather_bot.py --channel weather --interactive")
-        print()
-        print("  # Multiple channels (solves the problem statement):")
-        print("  python3 weather_bot.py --channel weather,alerts --interactive")
-        print()
-        print("  # Multiple channels with spaces:")
-        print("  python3 weather_bot.py --channel 'weather, alerts, emergency' --interactive")
-        print()
-
-        return 0
-
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
-    except Exception as e:
-        print(f"\n❌ Error during testing: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
+    log(f"{_RULE}\nTEST: Problem Statement Scenario\n{_RULE}")
+    log("User request: 'tested with alerts channel but would like it")
+    log("              to run on weather channel in meshcore'")
+    log()
+
+    # 'alerts' and 'weather' configured in radio slots 1 and 2
+    alerts_idx, weather_idx = 1, 2
+
+    # Process the weather requests directly without starting the serial loop
+    bot._handle_channel_message("user: wx London", alerts_idx)
+    bot._handle_channel_message("user: wx London", weather_idx)
+
+    # Verify each request was answered on its own channel
+    sent_messages = make_capture(bot_serial.writes)
+    assert sent_messages == [(alerts_idx, _REPORT), (weather_idx, _REPORT)], \
+        f"Expected replies on 'alerts' and 'weather', got {sent_messages}"
+
+    log("✓ Weather response sent on both 'alerts' and 'weather' channels")
+    log("✓ Bot supports multiple channels as requested!")
+    log()
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(pytest.main([__file__]))
@@ -3,102 +3,82 @@
 Edge case tests for USB port detection
 """
 
+import re
 import sys
 import unittest
-from unittest.mock import patch, MagicMock
+from collections import namedtuple
+import meshcore
+from unittest.mock import patch
 from meshcore import find_serial_ports
 
 
+# Stand-in for pyserial's ListPortInfo: find_serial_ports only reads these fields
+Port = namedtuple('Port', ['device', 'description'])
+
+# Device paths find_serial_ports should treat as LoRa-capable serial ports
+USB_RE = re.compile(r'/dev/tty(USB|ACM|AMA)\d+$')
+
+MIXED_PORTS = (
+    Port('/dev/ttyUSB0', 'USB Serial'),    # USB (included)
+    Port('/dev/ttyUSB1', 'USB Serial'),
+    Port('/dev/ttyACM0', 'Arduino'),       # ACM (included)
+    Port('/dev/ttyAMA0', 'UART'),          # Raspberry Pi UART (included)
+    Port('/dev/ttyS0', 'Built-in'),        # Built-in serial (excluded)
+)
+
+
 class TestUSBPortEdgeCases(unittest.TestCase):
     """Test edge cases for USB port detection"""
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_exception_during_port_listing(self, mock_list_ports):
+    def setUp(self):
+        avail = patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+        avail.start()
+        self.addCleanup(avail.stop)
+
+        list_ports = patch.object(meshcore, 'list_ports')
+        self.mock_list_ports = list_ports.start()
+        self.addCleanup(list_ports.stop)
+
+    def _set_ports(self, *ports):
+        """Make list_ports.comports() report the given ports"""
+        self.mock_list_ports.comports.return_value = ports
+
+    def test_exception_during_port_listing(self):
         """Test that exceptions during port listing are handled gracefully"""
-        mock_list_ports.comports.side_effect = Exception("USB subsystem error")
+        self.mock_list_ports.comports.side_effect = Exception("USB subsystem error")
         
         # Should return empty list, not crash
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         self.assertEqual(ports, [])
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_port_with_none_description(self, mock_list_ports):
+    def test_port_with_none_description(self):
         """Test handling of ports with None description"""
-        port = MagicMock()
-        port.device = '/dev/ttyUSB0'
-        port.description = None
-        
-        mock_list_ports.comports.return_value = [port]
+        self._set_ports(Port('/dev/ttyUSB0', None))
         
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         self.assertEqual(len(ports), 1)
         self.assertIn('/dev/ttyUSB0', ports)
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_duplicate_ports_handled(self, mock_list_ports):
+    def test_duplicate_ports_handled(self):
         """Test that duplicate port entries are handled (pyserial may return duplicates)"""
-        port1 = MagicMock()
-        port1.device = '/dev/ttyUSB0'
-        port1.description = 'Device 1'
-        
-        port2 = MagicMock()
-        port2.device = '/dev/ttyUSB0'
-        port2.description = 'Device 1 duplicate'
-        
-        mock_list_ports.comports.return_value = [port1, port2]
+        self._set_ports(Port('/dev/ttyUSB0', 'Device 1'), Port('/dev/ttyUSB0', 'Device 1 duplicate'))
         
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         # pyserial may return duplicate entries; we return them all
         # The Serial.open() will handle connection to the first working one
         self.assertEqual(len(ports), 2)
         self.assertEqual(ports[0], '/dev/ttyUSB0')
         self.assertEqual(ports[1], '/dev/ttyUSB0')
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_mixed_port_types(self, mock_list_ports):
+    def test_mixed_port_types(self):
         """Test filtering of mixed port types"""
-        ports_list = []
-        
-        # USB ports (should be included)
-        for i in range(2):
-            port = MagicMock()
-            port.device = f'/dev/ttyUSB{i}'
-            port.description = 'USB Serial'
-            ports_list.append(port)
-        
-        # ACM ports (should be included)
-        port = MagicMock()
-        port.device = '/dev/ttyACM0'
-        port.description = 'Arduino'
-        ports_list.append(port)
-        
-        # AMA port (should be included - Raspberry Pi UART)
-        port = MagicMock()
-        port.device = '/dev/ttyAMA0'
-        port.description = 'UART'
-        ports_list.append(port)
-        
-        # Built-in serial (should be excluded)
-        port = MagicMock()
-        port.device = '/dev/ttyS0'
-        port.description = 'Built-in'
-        ports_list.append(port)
-        
-        mock_list_ports.comports.return_value = ports_list
-        
-        ports = find_serial_ports(debug=False)
-        
+        self._set_ports(*MIXED_PORTS)
+
+        ports = find_serial_ports(debug=False, refresh=True)
+
         # Should have USB, ACM, and AMA but not ttyS
         self.assertEqual(len(ports), 4)
-        self.assertIn('/dev/ttyUSB0', ports)
-        self.assertIn('/dev/ttyUSB1', ports)
-        self.assertIn('/dev/ttyACM0', ports)
-        self.assertIn('/dev/ttyAMA0', ports)
-        self.assertNotIn('/dev/ttyS0', ports)
+        self.assertEqual(set(ports), {p.device for p in MIXED_PORTS if USB_RE.match(p.device)})
 
 
 def run_tests():
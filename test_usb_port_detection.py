@@ -3,112 +3,113 @@
 Test USB port detection functionality
 """
 
+import re
 import sys
 import unittest
+from collections import namedtuple
+import meshcore
 from unittest.mock import MagicMock, patch, Mock
 from meshcore import find_serial_ports, MeshCore, SERIAL_AVAILABLE
 
 
+# Stand-in for pyserial's ListPortInfo: find_serial_ports only reads these fields
+Port = namedtuple('Port', ['device', 'description'])
+
+# Device paths find_serial_ports should treat as LoRa-capable serial ports
+USB_RE = re.compile(r'/dev/tty(USB|ACM|AMA)\d+$')
+
+
 class TestUSBPortDetection(unittest.TestCase):
     """Test USB port detection"""
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_find_serial_ports_with_usb_devices(self, mock_list_ports):
+    def setUp(self):
+        list_ports = patch.object(meshcore, 'list_ports')
+        self.mock_list_ports = list_ports.start()
+        self.addCleanup(list_ports.stop)
+
+    def _set_ports(self, *ports):
+        """Make list_ports.comports() report the given ports"""
+        self.mock_list_ports.comports.return_value = ports
+
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+    def test_find_serial_ports_with_usb_devices(self):
         """Test finding USB serial ports"""
-        # Mock serial port objects
-        port1 = MagicMock()
-        port1.device = '/dev/ttyUSB0'
-        port1.description = 'USB Serial Device'
-        
-        port2 = MagicMock()
-        port2.device = '/dev/ttyUSB1'
-        port2.description = 'FTDI USB Serial'
-        
-        port3 = MagicMock()
-        port3.device = '/dev/ttyACM0'
-        port3.description = 'Arduino Uno'
-        
-        # Mock should return these ports
-        mock_list_ports.comports.return_value = [port1, port2, port3]
+        self._set_ports(
+            Port('/dev/ttyUSB0', 'USB Serial Device'),
+            Port('/dev/ttyUSB1', 'FTDI USB Serial'),
+            Port('/dev/ttyACM0', 'Arduino Uno'),
+        )
         
         # Test the function
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         
         # Should find all USB ports
         self.assertEqual(len(ports), 3)
-        self.assertIn('/dev/ttyUSB0', ports)
-        self.assertIn('/dev/ttyUSB1', ports)
-        self.assertIn('/dev/ttyACM0', ports)
+        self.assertEqual(set(ports), {'/dev/ttyUSB0', '/dev/ttyUSB1', '/dev/ttyACM0'})
+        self.assertTrue(all(USB_RE.match(p) for p in ports))
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_find_serial_ports_filters_non_usb(self, mock_list_ports):
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+    def test_find_serial_ports_filters_non_usb(self):
         """Test that non-USB ports are filtered out"""
-        # Mock serial port objects
-        port1 = MagicMock()
-        port1.device = '/dev/ttyUSB0'
-        port1.description = 'USB Serial Device'
-        
-        port2 = MagicMock()
-        port2.device = '/dev/ttyS0'
-        port2.description = 'Built-in Serial Port'
-        
-        mock_list_ports.comports.return_value = [port1, port2]
+        self._set_ports(
+            Port('/dev/ttyUSB0', 'USB Serial Device'),
+            Port('/dev/ttyS0', 'Built-in Serial Port'),
+        )
         
         # Test the function
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         
         # Should only find USB port, not ttyS0
-        self.assertEqual(len(ports), 1)
-        self.assertIn('/dev/ttyUSB0', ports)
-        self.assertNotIn('/dev/ttyS0', ports)
+        self.assertEqual(ports, ['/dev/ttyUSB0'])
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_find_serial_ports_empty(self, mock_list_ports):
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+    def test_find_serial_ports_empty(self):
         """Test when no serial ports are available"""
-        mock_list_ports.comports.return_value = []
+        self._set_ports()
         
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         
         self.assertEqual(len(ports), 0)
 
-    @patch('meshcore.SERIAL_AVAILABLE', False)
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', False)
     def test_find_serial_ports_no_pyserial(self):
         """Test when pyserial is not installed"""
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         
         self.assertEqual(len(ports), 0)
 
-    @patch('meshcore.SERIAL_AVAILABLE', True)
-    @patch('meshcore.list_ports')
-    def test_find_serial_ports_sorted_order(self, mock_list_ports):
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+    def test_find_serial_ports_sorted_order(self):
         """Test that ports are returned in sorted order"""
-        # Mock serial port objects in random order
-        port1 = MagicMock()
-        port1.device = '/dev/ttyUSB2'
-        port1.description = 'USB Serial 2'
-        
-        port2 = MagicMock()
-        port2.device = '/dev/ttyUSB0'
-        port2.description = 'USB Serial 0'
-        
-        port3 = MagicMock()
-        port3.device = '/dev/ttyUSB1'
-        port3.description = 'USB Serial 1'
-        
-        mock_list_ports.comports.return_value = [port1, port2, port3]
+        # Ports reported in random order
+        self._set_ports(
+            Port('/dev/ttyUSB2', 'USB Serial 2'),
+            Port('/dev/ttyUSB0', 'USB Serial 0'),
+            Port('/dev/ttyUSB1', 'USB Serial 1'),
+        )
         
         # Test the function
-        ports = find_serial_ports(debug=False)
+        ports = find_serial_ports(debug=False, refresh=True)
         
         # Should be sorted
         self.assertEqual(ports, ['/dev/ttyUSB0', '/dev/ttyUSB1', '/dev/ttyUSB2'])
 
-    @patch('meshcore.find_serial_ports')
-    @patch('meshcore.serial.Serial')
-    @patch('meshcore.SERIAL_AVAILABLE', True)
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
+    def test_find_serial_ports_cached(self):
+        """Test that back-to-back scans reuse one enumeration until refreshed"""
+        self._set_ports(Port('/dev/ttyUSB0', 'USB Serial'))
+
+        first = find_serial_ports(debug=False, refresh=True)
+        first.append('/dev/ttyUSB9')  # callers get their own copy
+        self.assertEqual(find_serial_ports(debug=False), ['/dev/ttyUSB0'])
+        self.assertEqual(self.mock_list_ports.comports.call_count, 1)
+
+        find_serial_ports(debug=False, refresh=True)
+        self.assertEqual(self.mock_list_ports.comports.call_count, 2)
+
+    @patch.object(meshcore, 'find_serial_ports')
+    @patch.object(meshcore.serial, 'Serial')
+    @patch.object(meshcore, 'SERIAL_AVAILABLE', True)
     def test_meshcore_auto_detect_on_failure(self, mock_serial_class, mock_find_ports):
         """Test that MeshCore auto-detects ports when specified port fails"""
         from meshcore import SerialException
@@ -120,10 +121,12 @@ class TestUSBPortDetection(unittest.TestCase):
         mock_serial_instance = MagicMock()
         mock_serial_instance.is_open = True
         
-        mock_serial_class.side_effect = [
-            SerialException("Port not found"),  # First attempt fails
-            mock_serial_instance  # Second attempt succeeds
-        ]
+        def _serial_side_effect():
+            yield SerialException("Port not found")  # First attempt fails
+            while True:
+                yield mock_serial_instance  # Later attempts succeed
+
+        mock_serial_class.side_effect = _serial_side_effect()
         
         # Create MeshCore with a port that doesn't exist
         mesh = MeshCore("test_node", debug=True, serial_port="/dev/ttyUSB999", baud_rate=9600)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for the viewlogs.py log viewer: reading the end of a log, the
+--errors/--grep line filters and --follow
+"""
+
+import sys
+import pytest
+import viewlogs
+from viewlogs import _line_filter, _tail_lines
+
+
+def _write_log(tmp_path, data):
+    """Write data (bytes) to a log file under tmp_path and return its path"""
+    path = tmp_path / "weather_bot.log"
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 7, 8192])
+@pytest.mark.parametrize("n", [1, 2, 9, 10, 11, 50])
+def test_tail_lines_across_blocks(tmp_path, monkeypatch, block_size, n):
+    """Test that the last n lines come back whole wherever the read blocks split them"""
+    lines = [f"2026-01-01 INFO line {i}\n" for i in range(10)]
+    path = _write_log(tmp_path, "".join(lines).encode("utf-8"))
+    monkeypatch.setattr(viewlogs, "TAIL_BLOCK_SIZE", block_size)
+
+    assert _tail_lines(path, n) == lines[-n:]
+
+
+@pytest.mark.parametrize("n,expected", [
+    (1, ["last"]),
+    (2, ["middle\n", "last"]),
+    (5, ["first\n", "middle\n", "last"]),
+])
+def test_tail_lines_without_trailing_newline(tmp_path, monkeypatch, n, expected):
+    """Test that an unterminated final line counts as a line"""
+    path = _write_log(tmp_path, b"first\nmiddle\nlast")
+    monkeypatch.setattr(viewlogs, "TAIL_BLOCK_SIZE", 4)
+
+    assert _tail_lines(path, n) == expected
+
+
+def test_tail_lines_empty_file(tmp_path):
+    """Test that an empty log has no lines"""
+    assert _tail_lines(_write_log(tmp_path, b""), 10) == []
+
+
+def test_tail_lines_invalid_utf8(tmp_path):
+    """Test that undecodable bytes are replaced rather than raising"""
+    path = _write_log(tmp_path, b"ok\nbad \xff byte\n")
+
+    assert _tail_lines(path, 1) == ["bad � byte\n"]
+
+
+# Characters str.splitlines() or universal newlines would treat as line breaks
+_NON_NEWLINE_SEPARATORS = ["\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029"]
+
+
+@pytest.mark.parametrize("sep", _NON_NEWLINE_SEPARATORS)
+def test_tail_lines_splits_on_newline_only(tmp_path, monkeypatch, sep):
+    """Test that only \\n ends a line, whatever else the logged text contains"""
+    lines = ["INFO first\n", f"INFO rx{sep}garbled{sep}text\n", "INFO last\n"]
+    path = _write_log(tmp_path, "".join(lines).encode("utf-8"))
+    monkeypatch.setattr(viewlogs, "TAIL_BLOCK_SIZE", 4)
+
+    assert _tail_lines(path, 2) == lines[1:]
+
+
+@pytest.mark.parametrize("sep", _NON_NEWLINE_SEPARATORS)
+def test_view_log_filtered_splits_on_newline_only(tmp_path, monkeypatch, capsys, sep):
+    """Test that filtered viewing keeps a line containing a separator whole"""
+    _write_log(tmp_path, f"ERROR bad{sep}frame\nINFO ok\n".encode("utf-8"))
+    monkeypatch.setattr(viewlogs, "LOGS_DIR", tmp_path)
+
+    assert viewlogs.view_log("bot", errors_only=True) == 0
+    assert capsys.readouterr().out.endswith(f"\nERROR bad{sep}frame\n")
+
+
+@pytest.mark.parametrize("line,accepted", [
+    ("2026-01-01 ERROR Serial port lost\n", True),
+    ("2026-01-01 CRITICAL Bot crashed\n", True),
+    ("2026-01-01 WARNING Retrying\n", False),
+    ("2026-01-01 INFO error count reset\n", False),  # --errors matches the level, case-sensitively
+])
+def test_errors_filter(line, accepted):
+    """Test that --errors keeps only ERROR and CRITICAL lines"""
+    assert _line_filter(errors_only=True)(line) is accepted
+
+
+@pytest.mark.parametrize("grep,line,accepted", [
+    ("weather", "INFO WX request: Weather for Leeds\n", True),  # case-insensitive
+    ("leeds", "INFO WX request for York\n", False),
+    ("a.b", "INFO a.b\n", True),
+    ("a.b", "INFO axb\n", False),                               # matched literally, not as a regex
+    ("[York]", "INFO [York] reply sent\n", True),
+])
+def test_grep_filter(grep, line, accepted):
+    """Test that --grep matches its text literally and case-insensitively"""
+    assert _line_filter(grep=grep)(line) is accepted
+
+
+def test_combined_filters():
+    """Test that --errors and --grep together require both to match"""
+    wanted = _line_filter(errors_only=True, grep="serial")
+
+    assert wanted("ERROR Serial port lost\n")
+    assert not wanted("ERROR Geocoding failed\n")
+    assert not wanted("INFO Serial port opened\n")
+
+
+def test_no_filters_accept_everything():
+    """Test that without --errors or --grep every line is shown"""
+    assert _line_filter()("anything\n")
+
+
+def _run_follow(monkeypatch, path, steps, lines=2, wanted=None, filtered=False):
+    """
+    Run _follow on path, performing one of steps (callables) at each poll
+    instead of sleeping, and stop it once they are used up
+    """
+    steps = iter(steps)
+
+    def poll(seconds):
+        step = next(steps, None)
+        if step is None:
+            raise KeyboardInterrupt  # how a user leaves --follow
+        step()
+
+    monkeypatch.setattr(viewlogs.time, "sleep", poll)
+    with pytest.raises(KeyboardInterrupt):
+        viewlogs._follow(path, lines, wanted or _line_filter(), filtered)
+
+
+def _append(path, data):
+    """Return a step appending data (bytes) to path"""
+    def step():
+        with open(path, "ab") as f:
+            f.write(data)
+    return step
+
+
+def test_follow_new_lines_rotation_and_truncation(tmp_path, monkeypatch, capsys):
+    """Test that --follow prints the tail, new lines, and keeps going across rotation and truncation"""
+    path = _write_log(tmp_path, b"old 1\nold 2\nold 3\n")
+
+    def rotate():
+        path.rename(tmp_path / "weather_bot.log.1")
+        path.write_bytes(b"rotated\n")
+
+    def truncate():
+        path.write_bytes(b"")
+
+    _run_follow(monkeypatch, path, [
+        _append(path, b"new 1\n"),
+        _append(path, b"part"),           # a line still being written...
+        _append(path, b"ial\n"),          # ...is printed once complete
+        rotate,
+        lambda: None,                     # rotated file read from the top
+        truncate,
+        _append(path, b"after truncate\n"),
+    ])
+
+    assert capsys.readouterr().out == (
+        "old 2\nold 3\n"
+        "new 1\npartial\n"
+        "rotated\n"
+        "after truncate\n"
+    )
+
+
+def test_follow_filtered(tmp_path, monkeypatch, capsys):
+    """Test that --follow with --errors filters both the shown tail and new lines"""
+    path = _write_log(tmp_path, b"ERROR one\nINFO two\nERROR three\nINFO four\n")
+
+    _run_follow(monkeypatch, path, [
+        _append(path, b"INFO five\nCRITICAL six\n"),
+    ], lines=1, wanted=_line_filter(errors_only=True), filtered=True)
+
+    assert capsys.readouterr().out == "ERROR three\nCRITICAL six\n"
+
+
+def test_follow_invalid_utf8(tmp_path, monkeypatch, capsys):
+    """Test that undecodable bytes written while following are replaced, not fatal"""
+    path = _write_log(tmp_path, b"")
+
+    _run_follow(monkeypatch, path, [_append(path, b"garbled \xff frame\n")])
+
+    assert capsys.readouterr().out == "garbled � frame\n"
+
+
+
+@pytest.mark.parametrize("sep", _NON_NEWLINE_SEPARATORS)
+def test_follow_splits_on_newline_only(tmp_path, monkeypatch, capsys, sep):
+    """Test that --follow prints a new line containing a separator whole"""
+    path = _write_log(tmp_path, b"")
+
+    _run_follow(monkeypatch, path, [_append(path, f"INFO rx{sep}text\n".encode("utf-8"))],
+                wanted=_line_filter(grep="text"))
+
+    assert capsys.readouterr().out == f"INFO rx{sep}text\n"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -2,71 +2,129 @@
 """
 Test script for MeshCore Weather Bot
 Demonstrates the bot's functionality with mock data when API is not accessible
+
+Full API integration needs network access; to test against the real API run:
+  python3 weather_bot.py --location 'London'
 """
 
+import os
 import sys
-from weather_bot import WeatherBot
-from meshcore import MeshCoreMessage
+import pytest
+from unittest.mock import patch
+from conftest import FakeResponse
+from weather_bot import WeatherBot, WEATHER_CODES
 
 
-def test_command_parsing():
-    """Test weather command parsing"""
-    print("=" * 60)
-    print("TEST 1: Command Parsing")
-    print("=" * 60)
-
-    bot = WeatherBot(debug=False)
-
-    test_cases = [
-        ("wx London", "London"),
-        ("weather Manchester", "Manchester"),
-        ("WX York", "York"),
-        ("WEATHER Leeds", "Leeds"),
-        ("wx  Birmingham  ", "Birmingham"),
-        ("hello", None),
-        ("wx", None),
-        ("weather", None),
-    ]
+# Test-body output is only shown with MCWB_TEST_VERBOSE set (run pytest
+# with -s to see it)
+log = print if os.getenv("MCWB_TEST_VERBOSE") else (lambda *args, **kwargs: None)
+
+
+def _section(number, title):
+    """Print a test's banner (verbose runs only)"""
+    log(f"{'=' * 60}\nTEST {number}: {title}\n{'=' * 60}")
+
+
+# Canned Open-Meteo geocoding and forecast payloads for the reply-channel tests
+_GEO_JSON = {"results": [{"name": "York", "country": "UK", "latitude": 53.9, "longitude": -1.1}]}
+_WX_JSON = {
+    "current": {"temperature_2m": 10, "apparent_temperature": 8, "relative_humidity_2m": 70,
+                "wind_speed_10m": 12, "wind_direction_10m": 180, "precipitation": 0, "weather_code": 1}
+}
+
 
-    for command, expected in test_cases:
-        result = bot.parse_weather_command(command)
-        status = "✓" if result == expected else "✗"
-        print(f"{status} '{command}' -> {result} (expected: {expected})")
+def _sent_channel_msg(frame):
+    """Split a sent CMD_SEND_CHANNEL_TXT_MSG frame into (channel_idx, text)"""
+    # 0x3C + len(2) + code(1) + txt_type(1) + channel_idx(1) + timestamp(4) + text
+    assert frame[3] == 0x03, f"Not a channel message frame: {frame.hex()}"
+    return frame[5], frame[10:].decode("utf-8")
 
-    print()
+
+COMMAND_CASES = (
+    ("wx London", "London"),
+    ("weather Manchester", "Manchester"),
+    ("WX York", "York"),
+    ("WEATHER Leeds", "Leeds"),
+    ("wx  Birmingham  ", "Birmingham"),
+    ("hello", None),
+    ("wx", None),
+    ("weather", None),
+)
+
+
+@pytest.mark.parametrize("command,expected", COMMAND_CASES)
+def test_command_parsing(command, expected):
+    """Test weather command parsing"""
+    _section(1, f"Command Parsing ({command!r})")
+
+    assert WeatherBot._parse_command(command) == expected
 
 
 def test_weather_code_descriptions():
     """Test weather code to description conversion"""
-    print("=" * 60)
-    print("TEST 2: Weather Code Descriptions")
-    print("=" * 60)
+    _section(2, "Weather Code Descriptions")
+
+    expected = {
+        0: "Clear sky",
+        1: "Mainly clear",
+        2: "Partly cloudy",
+        3: "Overcast",
+        45: "Fog",
+        51: "Light drizzle",
+        61: "Slight rain",
+        63: "Moderate rain",
+        71: "Slight snow",
+        80: "Slight showers",
+        95: "Thunderstorm",
+    }
 
-    bot = WeatherBot(debug=False)
+    for code, description in expected.items():
+        log(f"Code {code:2d}: {WEATHER_CODES.get(code)}")
+        assert WEATHER_CODES.get(code) == description, f"Wrong description for code {code}"
 
-    test_codes = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+    log()
 
-    for code in test_codes:
-        description = bot.get_weather_description(code)
-        print(f"Code {code:2d}: {description}")
 
-    print()
+def test_geocode_cached(wx_bot):
+    """Test that repeated lookups of a place reuse the cached geocoding result"""
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = [FakeResponse(_GEO_JSON), FakeResponse(_WX_JSON), FakeResponse(_WX_JSON)]
 
+        first = wx_bot._get_weather("York")
+        second = wx_bot._get_weather("york")
 
-def test_weather_formatting():
-    """Test weather response formatting"""
-    print("=" * 60)
-    print("TEST 3: Weather Response Formatting")
-    print("=" * 60)
+    assert first.startswith("York, UK")
+    assert second == first
+    assert mock_get.call_count == 3, "The second lookup should only fetch the forecast"
+    # The cache key is case-insensitive, but the API gets the user's spelling
+    assert mock_get.call_args_list[0][1]["params"]["name"] == "York"
 
-    bot = WeatherBot(debug=False)
+
+def test_geocode_not_found_retried(wx_bot):
+    """Test that a place that was not found is looked up again next time"""
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = [FakeResponse({"results": []}), FakeResponse(_GEO_JSON), FakeResponse(_WX_JSON)]
+
+        first = wx_bot._get_weather("York")
+        second = wx_bot._get_weather("York")
+
+    assert first == "Location not found: York"
+    assert second.startswith("York, UK"), "A miss must not be cached"
+    assert mock_get.call_count == 3
+
+
+def test_weather_formatting(wx_bot):
+    """Test weather response formatting"""
+    _section(3, "Weather Response Formatting")
 
     # Mock location data
     location_data = {
-        "name": "London",
-        "country": "GB",
-        "latitude": 51.5074,
-        "longitude": -0.1278
+        "results": [{
+            "name": "London",
+            "country_code": "GB",
+            "latitude": 51.5074,
+            "longitude": -0.1278
+        }]
     }
 
     # Mock weather data
@@ -82,227 +140,120 @@ def test_weather_formatting():
         }
     }
 
-    response = bot.format_weather_response(location_data, weather_data)
-    print(response)
-    print()
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = [FakeResponse(location_data), FakeResponse(weather_data)]
+        response = wx_bot._get_weather("London")
+
+    log(response)
+    log()
+    assert response.splitlines() == [
+        "London, GB",
+        "Partly cloudy",
+        "Temp: 12.5°C (feels 11.2°C)",
+        "Humid: 75%",
+        "Wind: 15.3 km/h at 230°",
+        "Precip: 0.0 mm",
+    ]
 
 
-def test_message_handling():
+def test_message_handling(wx_bot, bot_serial):
     """Test message handling"""
-    print("=" * 60)
-    print("TEST 4: Message Handling")
-    print("=" * 60)
-
-    bot = WeatherBot(debug=True)
-    bot.start()
+    _section(4, "Message Handling")
 
-    # Test with a weather command (will fail due to network, but shows handling)
-    MeshCoreMessage(
-        sender="test_user",
-        content="wx London",
-        message_type="text"
-    )
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = [FakeResponse(_GEO_JSON), FakeResponse(_WX_JSON)]
 
-    print("\nProcessing: 'wx London'")
-    print("-" * 40)
-    # Note: This will fail with network error in sandbox, but shows the flow
+        log("\nProcessing: 'wx York'")
+        wx_bot._handle_channel_message("test_user: wx York", 0)
+        # Anything that isn't a weather command gets no reply
+        wx_bot._handle_channel_message("test_user: hello", 0)
 
-    bot.stop()
-    print()
+    assert len(bot_serial.writes) == 1, "Expected exactly one reply"
+    channel_idx, text = _sent_channel_msg(bot_serial.writes[0])
+    assert channel_idx == 0
+    assert text.startswith("York, UK")
+    log(text)
+    log()
 
 
 def test_meshcore_integration():
     """Test MeshCore integration"""
-    print("=" * 60)
-    print("TEST 5: MeshCore Integration")
-    print("=" * 60)
+    _section(5, "MeshCore Integration")
 
     from meshcore import MeshCore
 
     # Test basic MeshCore functionality
-    mesh = MeshCore("test_node", debug=True)
+    mesh = MeshCore("test_node", debug=bool(os.getenv("MCWB_TEST_VERBOSE")))
 
-    print("\nStarting MeshCore...")
+    log("\nStarting MeshCore...")
     mesh.start()
 
-    print("\nSending test message...")
+    log("\nSending test message...")
     msg = mesh.send_message("Test weather request", "text")
 
-    print("\nSimulating message reception...")
+    log("\nSimulating message reception...")
+    received = []
 
     def test_handler(message):
-        print(f"Handler received: {message.content}")
+        log(f"Handler received: {message.content}")
+        received.append(message)
 
     mesh.register_handler("text", test_handler)
     mesh.receive_message(msg)
 
-    print("\nStopping MeshCore...")
+    log("\nStopping MeshCore...")
     mesh.stop()
-    print()
+    assert received == [msg], "The handler should receive the message once"
+    log()
 
 
-def test_reply_channel():
-    """Test reply channel functionality"""
-    print("=" * 60)
-    print("TEST 6: Reply Channel Logic")
-    print("=" * 60)
+@pytest.mark.parametrize("channel_idx", [
+    0,  # default channel
+    1,  # e.g. #weather
+    2,  # another channel slot
+])
+def test_reply_channel(wx_bot, bot_serial, channel_idx):
+    """Test that the bot replies on the channel_idx the request came from"""
+    _section(6, f"Reply Channel Logic (channel_idx={channel_idx})")
 
-    from unittest.mock import MagicMock, patch
+    with patch('weather_bot._SESSION.get') as mock_get:
+        mock_get.side_effect = [FakeResponse(_GEO_JSON), FakeResponse(_WX_JSON)]
 
-    with patch('weather_bot.requests.get') as mock_get:
-        # Mock geocoding and weather responses
-        geocoding_response = MagicMock()
-        geocoding_response.json.return_value = {
-            "results": [{"name": "York", "country": "UK", "latitude": 53.9, "longitude": -1.1}]
-        }
-        weather_response = MagicMock()
-        weather_response.json.return_value = {
-            "current": {"temperature_2m": 10, "apparent_temperature": 8, "relative_humidity_2m": 70,
-                       "wind_speed_10m": 12, "wind_direction_10m": 180, "precipitation": 0, "weather_code": 1}
-        }
-        mock_get.side_effect = [geocoding_response, weather_response]
-
-        # Create bot (no channel parameter - accepts all channels)
-        bot = WeatherBot(node_id="test_bot", debug=False)
-        
-        # Track sent messages
-        sent_messages = []
-        original_send = bot.mesh.send_message
-        def track_send(content, message_type, channel, channel_idx=None):
-            sent_messages.append({'channel': channel, 'channel_idx': channel_idx})
-            return original_send(content, message_type, channel, channel_idx)
-        bot.mesh.send_message = track_send
-        bot.mesh.start()
-
-        # Test 1: Message from default channel (idx=0) - bot should reply on same channel
-        print("\n1. Message from default channel (idx=0):")
-        msg = MeshCoreMessage(sender="user", content="wx york", message_type="text", channel=None, channel_idx=0)
-        sent_messages.clear()
-        bot.handle_message(msg)
-        # Bot replies on the channel where message came from to ensure user sees response
-        assert len(sent_messages) == 1
-        assert sent_messages[0]['channel_idx'] == 0, f"Expected channel_idx=0, got {sent_messages[0]['channel_idx']}"
-        print("   ✓ Bot replied on channel_idx 0 (where message came from)")
-
-        # Test 2: Message from named channel - bot should reply on same channel_idx
-        mock_get.side_effect = [geocoding_response, weather_response]
-        print("\n2. Message from channel_idx 1:")
-        msg = MeshCoreMessage(sender="user", content="wx york", message_type="text", channel="weather", channel_idx=1)
-        sent_messages.clear()
-        bot.handle_message(msg)
-        assert len(sent_messages) == 1 and sent_messages[0]['channel_idx'] == 1
-        print("   ✓ Bot replied on channel_idx 1 (where message came from)")
-
-        bot.mesh.stop()
-    
-    # Test bot WITHOUT configured channel - should reply on incoming channel
-    print("\n3. Bot WITHOUT configured channel (default behavior):")
-    with patch('weather_bot.requests.get') as mock_get:
-        mock_get.side_effect = [geocoding_response, weather_response]
-        bot_no_channel = WeatherBot(node_id="test_bot", debug=False)
-        
-        sent_messages = []
-        original_send = bot_no_channel.mesh.send_message
-        def track_send(content, message_type, channel, channel_idx=None):
-            sent_messages.append({'channel': channel, 'channel_idx': channel_idx})
-            return original_send(content, message_type, channel, channel_idx)
-        bot_no_channel.mesh.send_message = track_send
-        bot_no_channel.mesh.start()
-        
-        msg = MeshCoreMessage(sender="user", content="wx york", message_type="text", channel=None, channel_idx=2)
-        sent_messages.clear()
-        bot_no_channel.handle_message(msg)
-        assert len(sent_messages) == 1
-        assert sent_messages[0]['channel_idx'] == 2, f"Expected channel_idx=2, got {sent_messages[0]['channel_idx']}"
-        print("   ✓ Bot replied on channel_idx 2 (where message came from)")
-        
-        bot_no_channel.mesh.stop()
-    print()
-
-
-def test_announcement():
+        # Bot has no allowed_channel_idx - accepts all channels
+        wx_bot._handle_channel_message("user: wx york", channel_idx)
+
+    # Bot replies on the channel where message came from to ensure user sees response
+    assert len(bot_serial.writes) == 1
+    reply_idx, _ = _sent_channel_msg(bot_serial.writes[0])
+    assert reply_idx == channel_idx, f"Expected channel_idx={channel_idx}, got {reply_idx}"
+    log(f"   ✓ Bot replied on channel_idx {channel_idx} (where message came from)")
+
+
+def test_announcement(wx_bot, bot_serial):
     """Test periodic announcement functionality"""
-    print("=" * 60)
-    print("TEST 7: Periodic Announcement")
-    print("=" * 60)
+    _section(7, "Periodic Announcement")
 
     from weather_bot import ANNOUNCE_MESSAGE, ANNOUNCE_INTERVAL
 
     # Verify constants
     assert ANNOUNCE_INTERVAL == 3 * 60 * 60, "ANNOUNCE_INTERVAL should be 3 hours"
     assert "WX" in ANNOUNCE_MESSAGE, "Announcement should mention WX command"
-    print(f"  Announcement message: {ANNOUNCE_MESSAGE}")
-    print(f"  Announcement interval: {ANNOUNCE_INTERVAL}s ({ANNOUNCE_INTERVAL // 3600}h)")
-
-    # Test send_announcement sends to the configured announce_channel
-    bot = WeatherBot(node_id="test_bot", debug=False, announce_channel="wxtest")
-    bot.mesh.start()
-
-    sent_messages = []
-    original_send = bot.mesh.send_message
-    def track_send(content, message_type, channel, channel_idx=None):
-        sent_messages.append({"content": content, "channel": channel})
-        return original_send(content, message_type, channel, channel_idx)
-    bot.mesh.send_message = track_send
-
-    bot.send_announcement()
-    assert len(sent_messages) == 1, "Announcement should send exactly one message"
-    assert sent_messages[0]["channel"] == "wxtest", f"Expected channel 'wxtest', got '{sent_messages[0]['channel']}'"
-    assert sent_messages[0]["content"] == ANNOUNCE_MESSAGE, "Announcement content mismatch"
-    print("  ✓ Announcement sent to 'wxtest' channel with correct message")
-
-    # Test that announcement is suppressed when announce_channel is None
-    bot_no_announce = WeatherBot(node_id="test_bot2", debug=False, announce_channel=None)
-    bot_no_announce.mesh.start()
-    no_announce_messages = []
-    original_send2 = bot_no_announce.mesh.send_message
-    def track_send2(content, message_type, channel, channel_idx=None):
-        no_announce_messages.append({"content": content, "channel": channel})
-        return original_send2(content, message_type, channel, channel_idx)
-    bot_no_announce.mesh.send_message = track_send2
-    bot_no_announce.send_announcement()
-    assert len(no_announce_messages) == 0, "No announcement should be sent when announce_channel is None"
-    print("  ✓ Announcement suppressed when announce_channel is None")
-
-    bot.mesh.stop()
-    bot_no_announce.mesh.stop()
-    print()
-
-
-def main():
-    """Run all tests"""
-    print("\n")
-    print("╔" + "=" * 58 + "╗")
-    print("║" + " " * 10 + "MCWB - MeshCore Weather Bot Tests" + " " * 14 + "║")
-    print("╚" + "=" * 58 + "╝")
-    print()
-
-    try:
-        test_command_parsing()
-        test_weather_code_descriptions()
-        test_weather_formatting()
-        test_meshcore_integration()
-        test_reply_channel()
-        test_announcement()
-
-        print("=" * 60)
-        print("All component tests completed!")
-        print("=" * 60)
-        print()
-        print("Note: Full API integration tests require network access.")
-        print("To test with real API:")
-        print("  python3 weather_bot.py --location 'London'")
-        print("  python3 weather_bot.py --interactive")
-        print()
-
-        return 0
-
-    except Exception as e:
-        print(f"Error during testing: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
+    log(f"  Announcement message: {ANNOUNCE_MESSAGE}")
+    log(f"  Announcement interval: {ANNOUNCE_INTERVAL}s ({ANNOUNCE_INTERVAL // 3600}h)")
+
+    # Announcements follow the channel the last message arrived on
+    wx_bot._handle_channel_message("test_user: hello", 2)
+    assert wx_bot._announce_channel_idx == 2
+    assert bot_serial.writes == [], "A non-command message should get no reply"
+
+    wx_bot._send_channel_msg(ANNOUNCE_MESSAGE, wx_bot._announce_channel_idx)
+    assert len(bot_serial.writes) == 1, "Announcement should send exactly one message"
+    channel_idx, text = _sent_channel_msg(bot_serial.writes[0])
+    assert channel_idx == 2, f"Expected channel_idx 2, got {channel_idx}"
+    assert text == ANNOUNCE_MESSAGE, "Announcement content mismatch"
+    log("  ✓ Announcement sent on channel_idx 2 with correct message")
+    log()
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(pytest.main([__file__]))
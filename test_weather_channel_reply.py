@@ -3,141 +3,75 @@
 Test specifically for --channel weather scenario from problem statement.
 """
 
+import os
 import sys
-from unittest.mock import MagicMock, patch
-from weather_bot import WeatherBot
-from meshcore import MeshCoreMessage
+import pytest
 
+# Progress output is only printed with MCWB_TEST_VERBOSE set
+log = print if os.getenv("MCWB_TEST_VERBOSE") else (lambda *args, **kwargs: None)
 
-def test_weather_channel():
-    """Test bot with --channel weather"""
-    print()
-    print("=" * 70)
-    print("TEST: Bot with --channel weather")
-    print("=" * 70)
-    print()
-    
-    with patch('weather_bot.requests.get') as mock_get:
-        # Mock responses
-        geocoding_response = MagicMock()
-        geocoding_response.json.return_value = {
-            "results": [{
-                "name": "Barnsley",
-                "country": "United Kingdom",
-                "country_code": "GB",
-                "latitude": 53.55,
-                "longitude": -1.48333
-            }]
-        }
-        
-        weather_response = MagicMock()
-        weather_response.json.return_value = {
-            "current": {
-                "temperature_2m": 6.8,
-                "apparent_temperature": 4.1,
-                "relative_humidity_2m": 87,
-                "wind_speed_10m": 10.3,
-                "wind_direction_10m": 241,
-                "precipitation": 0.0,
-                "weather_code": 3
-            }
-        }
-        
-        mock_get.side_effect = [geocoding_response, weather_response]
-        
-        # Create bot with --channel weather (from problem statement)
-        bot = WeatherBot(node_id="WX_BOT", debug=True, channel="weather")
-        
-        # Track messages
-        sent_messages = []
-        original_send = bot.mesh.send_message
-        
-        def track_send(content, message_type, channel=None, channel_idx=None):
-            sent_messages.append({
-                'content': content,
-                'channel': channel,
-                'channel_idx': channel_idx
-            })
-            return original_send(content, message_type, channel, channel_idx)
-        
-        bot.mesh.send_message = track_send
-        bot.mesh.start()
-        
-        # Simulate exact message from problem statement logs
-        msg = MeshCoreMessage(
-            sender="USER1",
-            content="Wx barnsley",
-            message_type="text",
-            channel=None,
-            channel_idx=0
-        )
-        
-        print("Scenario from problem statement:")
-        print("  Command: python3 weather_bot.py --channel weather")
-        print(f"  Receives: message from {msg.sender} on channel_idx {msg.channel_idx}")
-        print(f"  Content: {msg.content}")
-        print()
-        
-        sent_messages.clear()
-        bot.handle_message(msg)
-        
-        print("Checking bot reply...")
-        assert len(sent_messages) == 1
-        
-        sent = sent_messages[0]
-        print(f"  Bot replied on: channel='{sent['channel']}', channel_idx={sent['channel_idx']}")
-        print()
-        
-        if sent['channel_idx'] == 0:
-            print("✅ SUCCESS!")
-            print()
-            print("Bot correctly replied on channel_idx 0 (where message came from)")
-            print("This ensures the sender receives the reply regardless of their")
-            print("channel configuration (different users map #weather to different channel_idx)")
-            success = True
-        else:
-            print("❌ FAILED!")
-            print(f"  Expected: channel_idx=0")
-            print(f"  Got: channel_idx={sent['channel_idx']}")
-            success = False
-        
-        bot.mesh.stop()
-        return success
+# Canned Open-Meteo geocoding and forecast payloads
+_GEO_JSON = {
+    "results": [{
+        "name": "Barnsley",
+        "country": "United Kingdom",
+        "country_code": "GB",
+        "latitude": 53.55,
+        "longitude": -1.48333
+    }]
+}
+_WX_JSON = {
+    "current": {
+        "temperature_2m": 6.8,
+        "apparent_temperature": 4.1,
+        "relative_humidity_2m": 87,
+        "wind_speed_10m": 10.3,
+        "wind_direction_10m": 241,
+        "precipitation": 0.0,
+        "weather_code": 3
+    }
+}
 
 
-def main():
-    """Run the test"""
-    print()
-    print("╔" + "=" * 68 + "╗")
-    print("║" + " " * 18 + "Weather Channel Reply Test" + " " * 24 + "║")
-    print("╚" + "=" * 68 + "╝")
-    
-    try:
-        success = test_weather_channel()
-        
-        print()
-        print("=" * 70)
-        if success:
-            print("✅ TEST PASSED")
-            print()
-            print("The bot correctly replies on the same channel where")
-            print("the query came from. This is critical because different")
-            print("users may have #weather mapped to different channel_idx values")
-            print("depending on their join order. Replying on the incoming")
-            print("channel ensures the sender always receives the response.")
-        else:
-            print("❌ TEST FAILED")
-        print("=" * 70)
-        print()
-        
-        return 0 if success else 1
-        
-    except Exception as e:
-        print(f"❌ ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
+def test_weather_channel(wx_bot, bot_serial, open_meteo, monkeypatch):
+    """
+    Test bot with --channel-idx set to the weather channel
 
+    The bot must reply on the same channel where the query came from.
+    This is critical because different users may have #weather mapped to
+    different channel_idx values depending on their join order; replying
+    on the incoming channel ensures the sender always receives the response.
+    """
+    log()
+    log("=" * 70)
+    log("TEST: Bot with --channel-idx 0 (weather)")
+    log("=" * 70)
+    log()
+    
+    open_meteo(_GEO_JSON, _WX_JSON)
+    
+    # Listen only on the weather channel's slot, as with --channel-idx 0
+    monkeypatch.setattr(wx_bot, "allowed_channel_idx", 0)
+    
+    # Simulate exact message from problem statement logs
+    sender, content, channel_idx = "USER1", "Wx barnsley", 0
+    
+    log("Scenario from problem statement:")
+    log("  Command: python3 weather_bot.py --channel-idx 0")
+    log(f"  Receives: message from {sender} on channel_idx {channel_idx}")
+    log(f"  Content: {content}")
+    log()
+    
+    wx_bot._handle_channel_message(f"{sender}: {content}", channel_idx)
+    
+    # 0x3C + len(2) + code(1) + txt_type(1) + channel_idx(1) + timestamp(4) + text
+    replies = [frame for frame in bot_serial.writes if frame[3] == 0x03]
+    assert len(replies) == 1
+    reply_idx, text = replies[0][5], replies[0][10:].decode("utf-8")
+    log(f"  Bot replied on: channel_idx={reply_idx}")
+    assert reply_idx == channel_idx, \
+        f"Expected channel_idx={channel_idx} (where message came from), got {reply_idx}"
+    assert text.startswith("Barnsley, GB\nOvercast"), f"Unexpected reply {text!r}"
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(pytest.main([__file__]))
@@ -7,12 +7,26 @@ Provides easy command-line access to view logs
 import sys
 import os
 import argparse
+import collections
+import io
+import re
+import time
 from pathlib import Path
-import subprocess
 
 # Get the logs directory
 LOGS_DIR = Path(__file__).parent / "logs"
 
+# Block size used when reading a log backwards for -n
+TAIL_BLOCK_SIZE = 8192
+
+# Lines shown before following a log (as tail -f) and the poll interval, in
+# seconds, while waiting for new lines
+FOLLOW_DEFAULT_LINES = 10
+FOLLOW_POLL_INTERVAL = 0.1
+
+# Lines shown by --errors
+ERRORS_PATTERN = re.compile(r'ERROR|CRITICAL')
+
 # Available log files
 LOG_FILES = {
     "bot": "weather_bot.log",
@@ -32,22 +46,25 @@ def list_logs():
         print("No logs directory found!")
         return
     
+    # One directory scan serves both sections
+    with os.scandir(LOGS_DIR) as it:
+        entries = {entry.name: entry for entry in it if entry.is_file()}
+    
     for log_type, filename in LOG_FILES.items():
-        log_path = LOGS_DIR / filename
-        if log_path.exists():
-            size = log_path.stat().st_size
-            size_str = format_size(size)
+        entry = entries.get(filename)
+        if entry is not None:
+            size_str = format_size(entry.stat().st_size)
             print(f"  {log_type:20s} -> {filename:30s} ({size_str})")
         else:
             print(f"  {log_type:20s} -> {filename:30s} (not found)")
     
     # List any other log files
     print("\nOther files in logs/:")
-    for file in LOGS_DIR.glob("*"):
-        if file.name not in LOG_FILES.values() and file.is_file():
-            size = file.stat().st_size
-            size_str = format_size(size)
-            print(f"  {file.name:50s} ({size_str})")
+    known = set(LOG_FILES.values())
+    for name, entry in entries.items():
+        if name not in known:
+            size_str = format_size(entry.stat().st_size)
+            print(f"  {name:50s} ({size_str})")
 
 
 def format_size(bytes_size):
@@ -59,6 +76,78 @@ def format_size(bytes_size):
     return f"{bytes_size:.1f} TB"
 
 
+def _tail_lines(path, n):
+    """Return the last n lines of a file, reading backwards from the end in blocks"""
+    chunks = []
+    newlines = 0
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        # n complete lines need n+1 newlines in view (the file's final newline
+        # included) unless we reach the start of the file first
+        while pos > 0 and newlines <= n:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+    # Split on b'\n' only: str.splitlines() would also break lines at form
+    # feeds, \x1c-\x1e, NEL and U+2028 inside logged text
+    lines = io.BytesIO(b''.join(reversed(chunks))).readlines()[-n:]
+    return [line.decode('utf-8', errors='replace') for line in lines]
+
+
+def _line_filter(errors_only=False, grep=None):
+    """Return a predicate accepting the lines that match every requested filter"""
+    matchers = []
+    if errors_only:
+        matchers.append(ERRORS_PATTERN.search)
+    if grep:
+        matchers.append(re.compile(re.escape(grep), re.IGNORECASE).search)
+    return lambda line: all(match(line) for match in matchers)
+
+
+def _follow(path, lines, wanted, filtered):
+    """Print the last lines of a log, then new matching lines as they are written"""
+    # newline='\n' as in _tail_lines: universal newlines would split lines at
+    # a stray \r inside logged text
+    f = open(path, 'r', encoding='utf-8', errors='replace', newline='\n')
+    try:
+        f.seek(0, os.SEEK_END)
+        inode = os.fstat(f.fileno()).st_ino
+
+        if filtered:
+            with open(path, 'r', encoding='utf-8', errors='replace', newline='\n') as head:
+                recent = collections.deque(filter(wanted, head), maxlen=lines)
+        else:
+            recent = _tail_lines(path, lines)
+        for line in recent:
+            print(line, end='')
+
+        while True:
+            where = f.tell()
+            line = f.readline()
+            if line.endswith('\n'):
+                if wanted(line):
+                    print(line, end='', flush=True)
+                continue
+
+            # At EOF (or a partly written line): wait, then re-read from here
+            f.seek(where)
+            time.sleep(FOLLOW_POLL_INTERVAL)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # rotated away; wait for the new file to appear
+            if st.st_ino != inode or st.st_size < where:
+                # Log was rotated or truncated: start again from the top
+                f.close()
+                f = open(path, 'r', encoding='utf-8', errors='replace', newline='\n')
+                inode = os.fstat(f.fileno()).st_ino
+    finally:
+        f.close()
+
+
 def view_log(log_type, lines=None, follow=False, errors_only=False, grep=None):
     """View a log file"""
     if log_type not in LOG_FILES:
@@ -75,29 +164,21 @@ def view_log(log_type, lines=None, follow=False, errors_only=False, grep=None):
     
     try:
         if follow:
-            # Use tail -f to follow the log
-            cmd = ["tail", "-f", str(log_path)]
-            if lines:
-                cmd = ["tail", "-f", "-n", str(lines), str(log_path)]
             print(f"Following log: {log_path}")
             print("Press Ctrl+C to stop")
             print("-" * 70)
-            subprocess.run(cmd)
+            _follow(log_path, lines or FOLLOW_DEFAULT_LINES,
+                    _line_filter(errors_only, grep), errors_only or grep)
         else:
-            # Read and display the log
-            with open(log_path, 'r') as f:
-                log_lines = f.readlines()
-            
-            # Filter if requested
-            if errors_only:
-                log_lines = [line for line in log_lines if 'ERROR' in line or 'CRITICAL' in line]
-            
-            if grep:
-                log_lines = [line for line in log_lines if grep.lower() in line.lower()]
-            
-            # Show last N lines if specified
-            if lines:
-                log_lines = log_lines[-lines:]
+            if lines and not (errors_only or grep):
+                # Only the end of the file is needed
+                log_lines = _tail_lines(log_path, lines)
+            else:
+                # Stream the log through the filters, keeping only the last N
+                # matching lines in memory if a limit was given
+                with open(log_path, 'r', encoding='utf-8', errors='replace', newline='\n') as f:
+                    log_lines = list(collections.deque(filter(_line_filter(errors_only, grep), f),
+                                                       maxlen=lines or None))
             
             # Display
             if not log_lines:
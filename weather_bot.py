@@ -7,10 +7,10 @@ Uses the free Open-Meteo API (no API key required).
 """
 
 import sys
-import re
 import time
 import threading
 import argparse
+from typing import Dict, Optional, Tuple
 
 try:
     import requests
@@ -60,10 +60,72 @@ WEATHER_CODES = {
     96: "Thunderstorm w/ slight hail", 99: "Thunderstorm w/ heavy hail",
 }
 
+# Reply text for a weather lookup
+_WX_REPORT = (
+    "{loc}\n"
+    "{cond}\n"
+    "Temp: {temp}°C (feels {feels}°C)\n"
+    "Humid: {humid}%\n"
+    "Wind: {wind} km/h at {wind_dir}°\n"
+    "Precip: {precip} mm"
+)
+
+# Shared HTTP session: the forecast request reuses the keep-alive connection
+# opened by the geocoding request instead of repeating the TLS handshake
+_SESSION = requests.Session()
+
+
+# Command words (lower-cased) that introduce a "WX <location>" request
+_WX_COMMANDS = frozenset(("wx", "weather"))
+
 ANNOUNCE_INTERVAL = 3 * 60 * 60  # seconds between periodic announcements
 ANNOUNCE_MESSAGE = "Hello this is the WX BoT. To get a weather update simply type WX and your location."
 
 
+# Successful geocoding lookups: lower-cased name -> (name, country, lat, lon)
+_geocode_cache: Dict[str, Tuple[Optional[str], str, float, float]] = {}
+_GEOCODE_CACHE_MAX = 256
+
+
+def _geocode(name: str) -> Optional[Tuple[Optional[str], str, float, float]]:
+    """
+    Resolve a place name to (name, country, lat, lon), or None if not found.
+
+    Places that were found are cached case-insensitively, so a miss or a
+    failed request is retried on the next lookup; call _geocode.cache_clear()
+    to empty the cache.
+    """
+    key = name.lower()
+    place = _geocode_cache.get(key)
+    if place is not None:
+        return place
+
+    geo = _SESSION.get(
+        "https://geocoding-api.open-meteo.com/v1/search",
+        params={"name": name, "count": 1, "language": "en", "format": "json"},
+        timeout=10,
+    ).json()
+
+    if "results" not in geo or not geo["results"]:
+        return None
+
+    r = geo["results"][0]
+    place = (
+        r.get("name"),
+        r.get("country_code", r.get("country", "")),
+        r["latitude"],
+        r["longitude"],
+    )
+    if len(_geocode_cache) >= _GEOCODE_CACHE_MAX:
+        # Evict the oldest entry
+        _geocode_cache.pop(next(iter(_geocode_cache)), None)
+    _geocode_cache[key] = place
+    return place
+
+
+_geocode.cache_clear = _geocode_cache.clear
+
+
 class WeatherBot:
     """Lightweight MeshCore weather bot."""
 
@@ -238,8 +300,12 @@ class WeatherBot:
     @staticmethod
     def _parse_command(text: str):
         """Return location string if text matches WX/weather command, else None."""
-        m = re.match(r"^(?:wx|weather)\s+(.+)$", text.strip(), re.IGNORECASE)
-        return m.group(1).strip() if m else None
+        parts = text.split(None, 1)
+        if len(parts) < 2 or parts[0].lower() not in _WX_COMMANDS:
+            return None
+        location = parts[1].rstrip()
+        # Only single-line requests are commands
+        return location if "\n" not in location else None
 
     # ------------------------------------------------------------------
     # Weather data
@@ -248,21 +314,13 @@ class WeatherBot:
     def _get_weather(self, location: str) -> str:
         """Fetch weather for *location* and return a formatted string."""
         try:
-            geo = requests.get(
-                "https://geocoding-api.open-meteo.com/v1/search",
-                params={"name": location, "count": 1, "language": "en", "format": "json"},
-                timeout=10,
-            ).json()
-
-            if "results" not in geo or not geo["results"]:
+            place = _geocode(location)
+            if place is None:
                 return f"Location not found: {location}"
+            name, country, lat, lon = place
+            name = name or location
 
-            r = geo["results"][0]
-            name = r.get("name", location)
-            country = r.get("country_code", r.get("country", ""))
-            lat, lon = r["latitude"], r["longitude"]
-
-            wx = requests.get(
+            wx = _SESSION.get(
                 "https://api.open-meteo.com/v1/forecast",
                 params={
                     "latitude": lat,
@@ -278,18 +336,19 @@ class WeatherBot:
             ).json()
 
             c = wx.get("current", {})
-            cond = WEATHER_CODES.get(c.get("weather_code", 0), f"Code {c.get('weather_code', 0)}")
+            code = c.get("weather_code", 0)
+            cond = WEATHER_CODES.get(code) or f"Code {code}"
             loc_str = f"{name}, {country}" if country else name
 
-            return (
-                f"{loc_str}\n"
-                f"{cond}\n"
-                f"Temp: {c.get('temperature_2m', 'N/A')}°C "
-                f"(feels {c.get('apparent_temperature', 'N/A')}°C)\n"
-                f"Humid: {c.get('relative_humidity_2m', 'N/A')}%\n"
-                f"Wind: {c.get('wind_speed_10m', 'N/A')} km/h "
-                f"at {c.get('wind_direction_10m', 'N/A')}°\n"
-                f"Precip: {c.get('precipitation', 'N/A')} mm"
+            return _WX_REPORT.format(
+                loc=loc_str,
+                cond=cond,
+                temp=c.get("temperature_2m", "N/A"),
+                feels=c.get("apparent_temperature", "N/A"),
+                humid=c.get("relative_humidity_2m", "N/A"),
+                wind=c.get("wind_speed_10m", "N/A"),
+                wind_dir=c.get("wind_direction_10m", "N/A"),
+                precip=c.get("precipitation", "N/A"),
             )
         except Exception as e:
             return f"Weather error: {e}"